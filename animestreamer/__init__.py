@@ -1,3 +1,16 @@
+import logging
+
 from animestreamer.streamer import AnimeStreamer
 
-streamer = AnimeStreamer()
\ No newline at end of file
+logging.getLogger(__name__).addHandler(logging.NullHandler())  # nothing is printed over the interface
+
+del streamer  # the submodule, "from animestreamer import streamer" gives the instance
+
+
+def __getattr__(name: str):
+    """streamer is created on first use, importing the package doesn't touch the config"""
+    if name == "streamer":
+        global streamer
+        streamer = AnimeStreamer()
+        return streamer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
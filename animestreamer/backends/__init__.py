@@ -0,0 +1,40 @@
+from ._base import BackendError, SearchBackend
+from ._nyaapy import NyaaPyBackend
+
+LAZY = {  # http.client, http.server and xml take ~30 ms to import, only loaded when used
+    "MockNyaaServer": "._mock",
+    "RssBackend": "._rss"
+}
+BACKENDS = {  # config "backend": class name
+    "nyaapy": "NyaaPyBackend",
+    "rss": "RssBackend"
+}
+
+__all__ = [
+    "BACKENDS",
+    "BackendError",
+    "MockNyaaServer",
+    "NyaaPyBackend",
+    "RssBackend",
+    "SearchBackend",
+    "create_backend"
+]
+
+
+def __getattr__(name: str):
+    if name in LAZY:
+        from importlib import import_module
+        value = getattr(import_module(LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def create_backend(name: str, url: str = "", timeout: float = 10) -> SearchBackend:
+    """url: where the rss backend connects, eg a MockNyaaServer, timeout: seconds per request"""
+    if name not in BACKENDS:
+        raise ValueError(f"unknown search backend {name!r}, one of {', '.join(BACKENDS)}")
+    backend = globals().get(BACKENDS[name]) or __getattr__(BACKENDS[name])
+    if name == "rss":
+        return backend(url, timeout) if url else backend(timeout=timeout)
+    return backend()
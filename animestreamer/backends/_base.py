@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+
+class BackendError(Exception):
+    """A search page couldn't be fetched or read"""
+
+
+class SearchBackend:
+    """Where search pages come from. Results are dicts shaped like NyaaPy's:
+    id, category, url, name, download_url, magnet, size ("1.2 GiB"), date ("2022-05-10 12:34" UTC),
+    seeders, leechers, completed_downloads (all strings)."""
+    name = ""
+
+    def search(self, query: str, page: int) -> list[dict]:
+        """Results of a nyaa page, pages start at 1. Called from several threads at once."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,179 @@
+"""Local stand-in for nyaa serving recorded RSS pages with injected latency and errors.
+
+Run: python -m animestreamer.backends._mock --latency 0.2 --error-rate 0.1
+and set "backend": "rss", "backend_url": "http://127.0.0.1:8765" in config.json
+"""
+from __future__ import annotations
+import argparse
+import random
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, quote, urlsplit
+from xml.sax.saxutils import escape
+
+from animestreamer.backends._rss import RssBackend
+
+PER_PAGE = 75
+SHOWS = ("Spy x Family", "Chainsaw Man", "Bocchi the Rock!", "Mob Psycho 100 III", "Blue Lock", "Vinland Saga S2")
+GROUPS = ("SubsPlease", "Erai-raws", "EMBER", "Judas", "ASW", "Yameii")
+RSS_HEADER = ('<?xml version="1.0" encoding="utf-8"?>\n'
+              '<rss xmlns:atom="http://www.w3.org/2005/Atom" xmlns:nyaa="https://nyaa.si/xmlns/nyaa" version="2.0">'
+              '<channel><title>Nyaa - Torrent File RSS</title>')
+RSS_FOOTER = "</channel></rss>"
+
+
+def synthetic_page(query: str, page: int, total: int | None = None) -> bytes:
+    """RSS of a made up page, the same for the same query and page"""
+    rng = random.Random(f"{query}:{page}")
+    first = (page - 1) * PER_PAGE
+    count = PER_PAGE if total is None else max(0, min(PER_PAGE, total - first))
+    items = []
+    for ix in range(first, first + count):
+        torrent_id = 1_000_000 + ix
+        name = (f"[{rng.choice(GROUPS)}] {rng.choice(SHOWS)} - {rng.randint(1, 24):02d} "
+                f"({rng.choice(('480p', '720p', '1080p'))}) [{rng.getrandbits(32):08X}].mkv")
+        date = datetime(rng.randint(2018, 2022), rng.randint(1, 12), rng.randint(1, 28), tzinfo=timezone.utc)
+        items.append(
+            f"<item><title>{escape(name)}</title>"
+            f"<link>http://nyaa.si/download/{torrent_id}.torrent</link>"
+            f'<guid isPermaLink="true">http://nyaa.si/view/{torrent_id}</guid>'
+            f"<pubDate>{format_datetime(date)}</pubDate>"
+            f"<nyaa:seeders>{rng.randint(0, 5000)}</nyaa:seeders>"
+            f"<nyaa:leechers>{rng.randint(0, 500)}</nyaa:leechers>"
+            f"<nyaa:downloads>{rng.randint(0, 100_000)}</nyaa:downloads>"
+            f"<nyaa:infoHash>{rng.getrandbits(160):040x}</nyaa:infoHash>"
+            f"<nyaa:categoryId>1_2</nyaa:categoryId><nyaa:category>Anime - English-translated</nyaa:category>"
+            f"<nyaa:size>{rng.uniform(1, 999):.1f} {rng.choice(('KiB', 'MiB', 'GiB'))}</nyaa:size></item>"
+        )
+    return (RSS_HEADER + "".join(items) + RSS_FOOTER).encode()
+
+
+def recording_path(directory: Path, query: str, page: int) -> Path:
+    return directory / quote(query.strip().lower(), safe="") / f"{page}.xml"
+
+
+def record(directory: Path, queries: list[str], pages: int, url: str = "https://nyaa.si") -> None:
+    """Saves real RSS pages for the mock server to serve offline"""
+    backend = RssBackend(url)
+    for query in queries:
+        for page in range(1, pages + 1):
+            path = recording_path(directory, query, page)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(backend.get(backend.page_path(query, page)))
+    backend.close()
+
+
+class MockNyaaServer:
+    """HTTP server on localhost answering nyaa RSS searches (?page=rss&q=...&p=...).
+
+    Recorded pages are served from `recordings` (see record()), other pages are made up,
+    `total` results per query at most. Every response waits `latency` seconds (+- `jitter` of it)
+    and fails with a 503 with probability `error_rate`."""
+
+    def __init__(self, recordings: Path | None = None, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, total: int | None = None, port: int = 0) -> None:
+        self.recordings = recordings
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.total = total
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> MockNyaaServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-nyaa", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serves on the calling thread"""
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> MockNyaaServer:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def page(self, query: str, page: int) -> bytes:
+        if self.recordings is not None:
+            path = recording_path(self.recordings, query, page)
+            if path.exists():
+                return path.read_bytes()
+        return synthetic_page(query, page, self.total)
+
+    def _handler(self) -> Callable:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self) -> None:
+                with server._lock:
+                    server.requests += 1
+                params = parse_qs(urlsplit(self.path).query)
+                delay = server.latency * (1 + random.uniform(-server.jitter, server.jitter))
+                time.sleep(max(0.0, delay))
+                if random.random() < server.error_rate:
+                    self.send_error(503, "Injected error")
+                    return
+                query = params.get("q", [""])[0]
+                page = max(int(params.get("p", ["1"])[0] or 1), 1)
+                body = server.page(query, page)
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/xml; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except ConnectionError:  # the client gave up waiting
+                    self.close_connection = True
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency varies by +- jitter * latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of responses failing with 503")
+    parser.add_argument("--total", type=int, default=None, help="results per query, unlimited by default")
+    parser.add_argument("--recordings", type=Path, default=None, help="directory with recorded pages")
+    args = parser.parse_args()
+    server = MockNyaaServer(args.recordings, args.latency, args.jitter, args.error_rate, args.total, args.port)
+    print(f"serving nyaa RSS at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from animestreamer.backends._base import BackendError, SearchBackend
+
+
+class NyaaPyBackend(SearchBackend):
+    """Scrapes the nyaa HTML through NyaaPy, a new connection for every page.
+    NyaaPy has no timeout, searches stop waiting for a page after "page_deadline" instead."""
+    name = "nyaapy"
+
+    def __init__(self, nyaa=None) -> None:
+        self._nyaa = nyaa  # NyaaPy.Nyaa or something with the same search()
+
+    @property
+    def nyaa(self):
+        if self._nyaa is None:
+            from NyaaPy import Nyaa  # pulls in requests and bs4, too slow for startup
+            self._nyaa = Nyaa
+        return self._nyaa
+
+    def search(self, query: str, page: int) -> list[dict]:
+        try:
+            return self.nyaa.search(keyword=query, page=page)
+        except OSError as e:  # requests' errors
+            raise BackendError(f"nyaa: {e}") from e
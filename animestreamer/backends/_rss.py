@@ -0,0 +1,136 @@
+from __future__ import annotations
+import http.client
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote, urlencode, urlsplit
+from xml.etree import ElementTree
+
+from animestreamer.backends._base import BackendError, SearchBackend
+
+NYAA_NAMESPACE = "{https://nyaa.si/xmlns/nyaa}"
+TRACKERS = (  # the trackers nyaa puts into its own magnets
+    "http://nyaa.tracker.wf:7777/announce",
+    "udp://open.stealth.si:80/announce",
+    "udp://tracker.opentrackr.org:1337/announce",
+    "udp://exodus.desync.com:6969/announce",
+    "udp://tracker.torrent.eu.org:451/announce"
+)
+
+
+def magnet(info_hash: str, name: str) -> str:
+    trackers = "".join(f"&tr={quote(tracker, safe='')}" for tracker in TRACKERS)
+    return f"magnet:?xt=urn:btih:{info_hash}&dn={quote(name, safe='')}{trackers}"
+
+
+def parse_rss(body: bytes) -> list[dict]:
+    """nyaa RSS -> NyaaPy-shaped results"""
+    try:
+        channel = ElementTree.fromstring(body).find("channel")
+    except ElementTree.ParseError as e:
+        raise BackendError(f"invalid RSS: {e}") from e
+    if channel is None:
+        raise BackendError("invalid RSS: no channel")
+    results = []
+    for item in channel.iter("item"):
+        nyaa = lambda tag: item.findtext(NYAA_NAMESPACE + tag, "")
+        name = item.findtext("title", "")
+        view_url = item.findtext("guid", "")
+        try:
+            date = parsedate_to_datetime(item.findtext("pubDate", "")).strftime("%Y-%m-%d %H:%M")
+        except (TypeError, ValueError):
+            date = ""
+        results.append({
+            "id": view_url.rstrip("/").rpartition("/")[2],
+            "category": nyaa("category"),
+            "url": view_url,
+            "name": name,
+            "download_url": item.findtext("link", ""),
+            "magnet": magnet(nyaa("infoHash"), name),
+            "size": nyaa("size"),
+            "date": date,
+            "seeders": nyaa("seeders"),
+            "leechers": nyaa("leechers"),
+            "completed_downloads": nyaa("downloads")
+        })
+    return results
+
+
+class RssBackend(SearchBackend):
+    """Reads the nyaa RSS feed over kept-alive connections, one per search thread.
+    The feed is a fraction of the HTML page and needs no HTML parser."""
+    name = "rss"
+
+    def __init__(self, url: str = "https://nyaa.si", timeout: float = 10) -> None:
+        parts = urlsplit(url)
+        self.url = url
+        self.secure = parts.scheme == "https"
+        self.host = parts.netloc
+        self.path = parts.path.rstrip("/") + "/"
+        self.timeout = timeout
+        self.requests = 0
+        self.connections = 0  # opened, the rest of the requests reused one
+        self._local = threading.local()
+        self._all: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def search(self, query: str, page: int) -> list[dict]:
+        return parse_rss(self.get(self.page_path(query, page)))
+
+    def page_path(self, query: str, page: int) -> str:
+        params = {"page": "rss", "q": query, "c": "0_0", "f": 0}
+        if page > 1:
+            params["p"] = page
+        return f"{self.path}?{urlencode(params)}"
+
+    def get(self, path: str) -> bytes:
+        """Body of a GET, a dropped kept-alive connection is reopened once"""
+        for attempt in range(2):
+            connection = self._connection()
+            reused = getattr(self._local, "used", False)
+            try:
+                connection.request("GET", path, headers={"Connection": "keep-alive", "User-Agent": "animestreamer"})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError) as e:
+                self._drop()
+                if reused and attempt == 0:  # the server closed the idle connection
+                    continue
+                raise BackendError(f"{self.host}: {e}") from e
+            except OSError as e:  # timeouts, refused connections
+                self._drop()
+                raise BackendError(f"{self.host}: {e}") from e
+            self._local.used = True
+            with self._lock:
+                self.requests += 1
+            if response.will_close:
+                self._drop()
+            if response.status != 200:
+                raise BackendError(f"{self.host}: HTTP {response.status} {response.reason}")
+            return body
+        raise BackendError(f"{self.host}: connection lost")
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            cls = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+            connection = self._local.connection = cls(self.host, timeout=self.timeout)
+            self._local.used = False
+            with self._lock:
+                self.connections += 1
+                self._all.append(connection)
+        return connection
+
+    def _drop(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+            with self._lock:
+                if connection in self._all:  # close() may have let go of it already
+                    self._all.remove(connection)
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._all:
+                connection.close()
+            self._all = []
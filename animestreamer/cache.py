@@ -0,0 +1,86 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class SearchCache:
+    """Raw NyaaPy results persisted on disk, keyed by (query, page).
+
+    Entries younger than `ttl` seconds are served as they are. Older entries are
+    only served when `revalidate` is set, the caller is then expected to fetch
+    the page again in the background and put() the fresh results.
+    The least recently used entries are evicted above `max_entries`."""
+
+    def __init__(self, path: Path, ttl: float = 3600, max_entries: int = 120, revalidate: bool = True) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, dict] | None = None  # loaded on first use, least recently used first
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str, page: int) -> str:
+        return f"{page}:{query.strip().lower()}"
+
+    def get(self, query: str, page: int) -> tuple[list, bool] | None:
+        """Returns (results, stale) or None on a miss"""
+        key = self.key(query, page)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            stale = entry is not None and time.time() - entry["time"] > self.ttl
+            if entry is None or (stale and not self.revalidate):
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            return entry["results"], stale
+
+    def put(self, query: str, page: int, results: list) -> None:
+        key = self.key(query, page)
+        with self._lock:
+            entries = self._load()
+            entries[key] = {"time": time.time(), "results": results}
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._dirty = True
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+            self._dirty = True
+
+    def save(self) -> None:
+        """Writes the cache to disk if it changed (temp file + rename so it's never half written)"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty or self._entries is None:
+                    return
+                content = json.dumps(list(self._entries.items()))
+                self._dirty = False
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(content, encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def _load(self) -> OrderedDict[str, dict]:
+        if self._entries is None:
+            try:
+                self._entries = OrderedDict(json.loads(self.path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                self._entries = OrderedDict()
+        return self._entries
@@ -0,0 +1,173 @@
+"""Headless searches for scripts and cron jobs, results are streamed as NDJSON without starting the app.
+
+Run: animestreamer search [--sort KEY] [--ascending] [--limit N] [--pages N] [--workers N] [QUERY ...]
+Queries are read from stdin, one per line, when none are given (or "-").
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterable, Iterator
+
+from rich.errors import MarkupError
+from rich.text import Text
+
+from animestreamer.results import SORT_ATTRIBUTES, Torrent
+from animestreamer.streamer import AnimeStreamer
+
+SORT_KEYS = (*SORT_ATTRIBUTES, "health")
+
+
+def create_streamers(count: int) -> list[AnimeStreamer]:
+    """One streamer per query searched at once, sharing the backend, rate limit, search cache and title parser.
+    Sorting and querying don't touch the app's settings."""
+    streamers = [AnimeStreamer() for _ in range(count)]
+    first = streamers[0]
+    for streamer in streamers:
+        streamer.config.readonly = True
+        streamer.backend, streamer.limiter, streamer.fetcher = first.backend, first.limiter, first.fetcher
+        streamer.cache, streamer.parser = first.cache, first.parser
+    return streamers
+
+
+def read_queries(args: list[str], stdin: IO[str]) -> Iterator[str]:
+    """Queries from argv, or lines of stdin as they come in"""
+    lines = stdin if not args or args == ["-"] else args
+    for line in lines:
+        if line.strip():
+            yield line.strip()
+
+
+class BatchSearch:
+    """Runs queries on `len(streamers)` workers, writes a line per result as each page is merged.
+    Within a page the results are in the order of the sorting, pages are written in the order they arrive."""
+
+    def __init__(self, streamers: list[AnimeStreamer], out: IO[str], sort_key: str = "seeders", reverse: bool = True,
+                 limit: int | None = None) -> None:
+        self.out = out
+        self.sort_key = sort_key
+        self.reverse = reverse
+        self.limit = limit  # results per query, the first ones to arrive
+        self.failed = 0  # queries with pages that couldn't be fetched
+        self.written = 0  # results
+        self.closed = threading.Event()  # the reader went away, eg piped to head
+        self._idle: queue.Queue[AnimeStreamer | None] = queue.Queue()  # None once closed
+        for streamer in streamers:
+            self._idle.put(streamer)
+        self._executor = ThreadPoolExecutor(max_workers=len(streamers), thread_name_prefix="batch")
+        self._lock = threading.Lock()
+
+    def run(self, queries: Iterable[str]) -> None:
+        """Blocks until every query is searched, queries are taken only as workers free up"""
+        futures = []
+        for query in queries:
+            streamer = self._idle.get()  # backpressure, stdin isn't read ahead of the workers
+            if self.closed.is_set():
+                break
+            futures.append(self._executor.submit(self.search, streamer, query))
+        for future in futures:
+            future.result()
+        self._executor.shutdown()
+
+    def search(self, streamer: AnimeStreamer, query: str) -> None:
+        try:
+            streamer.sort_key, streamer.sort_reverse = self.sort_key, self.reverse
+            count = 0
+            pages = streamer.search_pages(query)
+            for page, results, added in pages:
+                torrents = self.in_sort_order(streamer, added)
+                if self.limit is not None:
+                    torrents = torrents[:self.limit - count]
+                count += len(torrents)
+                raw = {result["id"]: result for result in results}
+                self.write([self.record(streamer, query, page, raw[torrent.id], torrent) for torrent in torrents])
+                if self.closed.is_set() or (self.limit is not None and count >= self.limit):
+                    pages.close()  # cancels the rest
+                    break
+            if streamer.failed_pages:
+                with self._lock:
+                    self.failed += 1
+                print(f"animestreamer: {query}: {len(streamer.failed_pages)} page(s) failed, {streamer.fetch_error}",
+                      file=sys.stderr)
+        finally:
+            self._idle.put(streamer)
+
+    @staticmethod
+    def in_sort_order(streamer: AnimeStreamer, torrents: list[Torrent]) -> list[Torrent]:
+        """The torrents in the order of streamer.results (sorted by sort_results when the page was merged)"""
+        if len(torrents) < 2:
+            return torrents
+        wanted = {torrent.id for torrent in torrents}
+        return [torrent for torrent in streamer.results if torrent.id in wanted]
+
+    @staticmethod
+    def record(streamer: AnimeStreamer, query: str, page: int, raw: dict, torrent: Torrent) -> dict:
+        try:
+            title = Text.from_markup(streamer.parse_torrent(torrent.name)).plain
+        except MarkupError:  # brackets in the name that look like a closing tag
+            title = torrent.name
+        return {
+            "query": query,
+            "page": page,
+            "title": title,
+            "parsed": streamer.parser.parse(torrent.name),
+            "raw": raw
+        }
+
+    def cancel(self) -> None:
+        """Stops taking queries, the searches running end after their current page"""
+        self.closed.set()
+        self._idle.put(None)  # wakes run() if it waits for a worker
+
+    def write(self, records: list[dict]) -> None:
+        """A page at a time, flushed right away so readers see results while the search goes on"""
+        if not records or self.closed.is_set():
+            return
+        lines = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+        with self._lock:
+            try:
+                self.out.write(lines)
+                self.out.flush()
+                self.written += len(records)
+            except BrokenPipeError:
+                self.cancel()
+
+
+def search_command(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="animestreamer search", description=__doc__.splitlines()[0])
+    parser.add_argument("queries", nargs="*", metavar="QUERY", help="read from stdin if none are given")
+    parser.add_argument("--sort", choices=SORT_KEYS, default="seeders", help="order of the results within a page")
+    parser.add_argument("--ascending", action="store_true", help="lowest first")
+    parser.add_argument("--limit", type=int, default=None, help="results per query, the first ones to arrive")
+    parser.add_argument("--pages", type=int, default=None, help="nyaa pages per query (75 results each), "
+                                                                "the pages setting by default")
+    parser.add_argument("--workers", type=int, default=4, help="queries searched at once")
+    args = parser.parse_args(argv)
+    if args.workers < 1 or (args.limit is not None and args.limit < 1) or (args.pages is not None and args.pages < 1):
+        parser.error("--workers, --limit and --pages have to be at least 1")
+    streamers = create_streamers(args.workers)
+    for streamer in streamers:
+        streamer.pages = args.pages or streamer.pages
+    batch = BatchSearch(streamers, sys.stdout, args.sort, not args.ascending, args.limit)
+    try:
+        batch.run(read_queries(args.queries, sys.stdin))
+    except KeyboardInterrupt:
+        batch.cancel()
+        return 130
+    finally:
+        streamers[0].cache.save()
+    if batch.closed.is_set():  # stdout would fail again when it's flushed at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 1 if batch.failed else 0
+
+
+def run() -> None:
+    """animestreamer starts the app, animestreamer search ... searches without it (Textual isn't imported)"""
+    if sys.argv[1:2] == ["search"]:
+        sys.exit(search_command(sys.argv[2:]))
+    from animestreamer.main import run as run_app
+    run_app()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import atexit
+import json
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows, the rename alone keeps the file whole there
+    fcntl = None
+
+
+class ConfigStore:
+    """Settings held in memory and written back in the background.
+
+    Changes are batched and written `delay` seconds after the last one (temp file + rename,
+    so the file is never half written). Only the keys changed here are written over what's
+    on disk at that moment, so instances running at the same time don't undo each other's settings."""
+
+    def __init__(self, path: Path, defaults: dict, delay: float = 1.0) -> None:
+        self.path = path
+        self.defaults = defaults
+        self.delay = delay
+        self.readonly = False  # changes stay in memory, eg sorting in headless searches
+        self._values: dict = {}
+        self._changed: set[str] = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        atexit.register(self.close)
+
+    def load(self) -> None:
+        """Reads the file, creates it with the defaults the first time"""
+        content = self._read()
+        if content is None:
+            self._values = dict(self.defaults)
+            self._changed = set(self.defaults)
+            self.flush()
+        else:
+            self._values = {**self.defaults, **content}
+
+    def __getitem__(self, key: str):
+        return self._values[key]
+
+    def get(self, key: str, default=None):
+        return self._values.get(key, default)
+
+    def set(self, key: str, value) -> None:
+        self.update(**{key: value})
+
+    def update(self, **values) -> None:
+        """Nothing is written if the values didn't change"""
+        with self._lock:
+            changed = {key for key, value in values.items() if self._values.get(key) != value}
+            if not changed:
+                return
+            self._values.update(values)
+            if self.readonly:
+                return
+            self._changed |= changed
+            self._schedule()
+
+    def _schedule(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Writes the changed keys now"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._changed:
+                    return
+                changed = {key: self._values[key] for key in self._changed}
+                self._changed = set()
+            try:
+                self._write(changed)
+            except OSError:
+                with self._lock:  # eg the file is open in another process on Windows, next change tries again
+                    self._changed |= set(changed)
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self.flush()
+
+    def _write(self, changed: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.with_name(f"{self.path.name}.lock").open("a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # released when closed
+            content = {**(self._read() or {}), **changed}
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(content, indent=4), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def _read(self) -> dict | None:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8-sig"))
+        except (OSError, ValueError):
+            return None
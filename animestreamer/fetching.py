@@ -0,0 +1,69 @@
+from __future__ import annotations
+import random
+import threading
+import time
+from typing import Callable
+
+from animestreamer.backends import BackendError
+
+
+class TokenBucket:
+    """Rate limit shared by every request of the app: `rate` requests per second on average,
+    up to `burst` at once after being idle. A rate of 0 doesn't limit."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Waits for a token, False if there's none within `timeout` seconds"""
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class ResilientFetch:
+    """Fetches a page through the rate limit, failed requests are retried after a jittered
+    exponential backoff (random between 0 and backoff * 2^attempt) until `deadline` seconds passed"""
+
+    def __init__(self, limiter: TokenBucket, retries: int = 3, backoff: float = 0.5,
+                 max_backoff: float = 4.0, deadline: float = 25.0) -> None:
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.retried = 0  # requests sent again
+
+    def __call__(self, search: Callable[[str, int], list], query: str, page: int) -> list:
+        """search: SearchBackend.search, raises the last BackendError when out of retries or time"""
+        start = time.monotonic()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+            if not self.limiter.acquire(self.deadline - (time.monotonic() - start)):
+                raise BackendError(f"page {page}: over the rate limit for {self.deadline:g} s")
+            try:
+                return search(query, page)
+            except BackendError as e:
+                error = e
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            if attempt == self.retries or time.monotonic() - start + delay > self.deadline:
+                break
+            time.sleep(delay)
+        raise error
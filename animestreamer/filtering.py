@@ -0,0 +1,145 @@
+from __future__ import annotations
+import re
+import threading
+from bisect import bisect_left
+from typing import Iterable
+
+FIELDS = {  # filter prefix: anitopy field
+    "group": "release_group",
+    "res": "video_resolution",
+    "ep": "episode_number",
+    "season": "anime_season"
+}
+NUMERIC_FIELDS = ("episode_number", "anime_season")  # matched exactly, other fields by prefix
+TOKEN = re.compile(r"[^\W_]+")
+CHECKSUM = re.compile(r"(?=[a-f]*\d)(?=\d*[a-f])[0-9a-f]{8}")  # CRC32 of the file, unique noise in the vocabulary
+SHAPES = (  # terms that look like a field value, eg "E05", "S2", "1080p"
+    (re.compile(r"e(?:p)?(\d+)"), "episode_number"),
+    (re.compile(r"s(\d+)"), "anime_season"),
+    (re.compile(r"(\d{3,4}p)"), "video_resolution")
+)
+RESOLUTION = re.compile(r"\d+x(\d+)")  # 1920x1080 -> 1080p
+MAX_BATCH = 2000  # episode ranges longer than this are garbage
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN.findall(text.lower())
+
+
+def index_tokens(name: str) -> list[str]:
+    return [token for token in tokenize(name) if not CHECKSUM.fullmatch(token)]
+
+
+def normalise(field: str, value: str) -> list[str]:
+    """anitopy value -> indexed values, episode ranges are expanded"""
+    if isinstance(value, list):  # episode_number: [from, to]
+        if field == "episode_number" and len(value) == 2 and value[0].isdigit() and value[1].isdigit():
+            first, last = int(value[0]), int(value[1])
+            if first <= last <= first + MAX_BATCH:
+                return [str(episode) for episode in range(first, last + 1)]
+        return [v for item in value for v in normalise(field, item)]
+    value = value.lower()
+    if field in NUMERIC_FIELDS:
+        return [value.lstrip("0") or "0"] if value.isdigit() else [value]
+    if field == "video_resolution":
+        match = RESOLUTION.fullmatch(value)
+        return [f"{match.group(1)}p"] if match else [value]
+    return [value]
+
+
+def field_matches(field: str, value: str, parsed: str | list[str]) -> bool:
+    """Whether the anitopy value of a field matches a "group:"/"res:"/"ep:"/"season:" filter value,
+    numbers exactly, the rest by prefix like FilterIndex.match"""
+    indexed = normalise(field, parsed)
+    if field in NUMERIC_FIELDS:
+        return normalise(field, value)[0] in indexed
+    value = value.lower()
+    return any(item.startswith(value) for item in indexed)
+
+
+class FilterIndex:
+    """Inverted index over the names and anitopy fields of the results, filled once at ingest.
+    Positions are the insertion indexes of ResultIndex. Names are indexed on the UI thread,
+    fields from the parse worker once the titles are parsed."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.generation = 0  # incremented on clear, fields of older results are dropped
+        self.version = 0  # incremented whenever something is indexed
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens: dict[str, set[int]] = {}  # token: positions
+            self._vocabulary: list[str] = []  # sorted tokens for prefix lookups
+            self._fields: dict[str, dict[str, set[int]]] = {field: {} for field in FIELDS.values()}
+            self.generation += 1
+            self.version += 1
+
+    def add_names(self, first: int, names: Iterable[str]) -> None:
+        """first: position of the first name"""
+        with self._lock:
+            added = False
+            for position, name in enumerate(names, first):
+                for token in index_tokens(name):
+                    postings = self._tokens.get(token)
+                    if postings is None:
+                        postings = self._tokens[token] = set()
+                        added = True
+                    postings.add(position)
+            if added:
+                self._vocabulary = sorted(self._tokens)
+            self.version += 1
+
+    def add_fields(self, generation: int, first: int, parsed: Iterable[dict]) -> None:
+        """parsed: anitopy results in the order of the names"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            for position, fields in enumerate(parsed, first):
+                for field, values in self._fields.items():
+                    if field in fields:
+                        for value in normalise(field, fields[field]):
+                            values.setdefault(value, set()).add(position)
+            self.version += 1
+
+    def match(self, query: str) -> set[int]:
+        """Positions matching every term of the query.
+        Terms match name tokens by prefix, "E05", "S2" and "1080p" also match the parsed fields,
+        "group:", "res:", "ep:" and "season:" match only the field."""
+        with self._lock:  # postings are sets the parse worker adds to
+            terms = [self._alternatives(term) for term in query.lower().split()]
+            if not terms:
+                return set()
+            terms.sort(key=lambda alternatives: sum(map(len, alternatives)))  # smallest first
+            matched = set().union(*terms[0])
+            for alternatives in terms[1:]:
+                if not matched:
+                    break
+                matched = set().union(*(matched & postings for postings in alternatives))
+            return matched
+
+    def _alternatives(self, term: str) -> list[set[int]]:
+        """Postings any of which the term matches"""
+        prefix, colon, value = term.partition(":")
+        if colon and prefix in FIELDS:
+            return self._field_postings(FIELDS[prefix], value)
+        alternatives = []
+        for token in tokenize(term):
+            start = bisect_left(self._vocabulary, token)
+            end = bisect_left(self._vocabulary, token + "\uffff", start)
+            postings = [self._tokens[t] for t in self._vocabulary[start:end]]
+            alternatives.append(set().union(*postings) if len(postings) != 1 else postings[0])
+        if len(alternatives) > 1:  # "x265" is one token, "spy-x" two, both have to match
+            alternatives = [set.intersection(*alternatives)]
+        for shape, field in SHAPES:
+            match = shape.fullmatch(term)
+            if match:
+                alternatives += self._field_postings(field, match.group(1))
+        return [postings for postings in alternatives if postings] or [set()]
+
+    def _field_postings(self, field: str, value: str) -> list[set[int]]:
+        values = self._fields[field]
+        if field in NUMERIC_FIELDS:
+            return [values.get(normalise(field, value)[0], set())]
+        return [postings for indexed, postings in values.items() if indexed.startswith(value)] or [set()]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence, Tuple, Union
+
+from animestreamer.results import ResultIndex, Torrent
+
+GroupKey = Tuple[str, str, str]  # anime_title, season, episode
+
+
+def number(value: str) -> str:
+    return (value.lstrip("0") or "0") if value.isdigit() else value.lower()
+
+
+def episode_key(parsed: dict) -> GroupKey | None:
+    """(anime_title, season, episode) of an anitopy parse, None without a title"""
+    title = parsed.get("anime_title")
+    if not title:
+        return None
+    season = parsed.get("anime_season", "")
+    episode = parsed.get("episode_number", "")
+    if isinstance(season, list):
+        season = "-".join(map(number, season))
+    if isinstance(episode, list):  # batch: [from, to]
+        episode = "-".join(map(number, episode))
+    return " ".join(title.lower().split()), number(season), number(episode)
+
+
+@dataclass
+class ResultGroup:
+    """Releases of one episode, in the order of the current sort"""
+    key: GroupKey
+    releases: list[Torrent] = field(default_factory=list)
+    best: Torrent | None = None  # healthiest swarm
+    expanded: bool = False
+
+
+GroupedRow = Union[ResultGroup, Torrent]  # group row, or a release of an expanded group
+
+
+class EpisodeGroups:
+    """Members of every episode by position in the ResultIndex, filled from the parse worker as results stream in.
+    Unparsed results are their own group until their title is parsed.
+
+    Each group keeps its members sorted by the current sort key and its healthiest release, only groups that
+    got new members are sorted again on a resort. Every group is re-sorted when the key changes, and when
+    health scores are recomputed for new results (they depend on all of them)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.generation = 0  # incremented on clear, parses of older results are dropped
+        self.version = 0  # incremented whenever results are grouped
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._members: dict[GroupKey, list[int]] = {}  # ascending positions
+            self._ungrouped: set[int] = set()  # positions not parsed yet or without a title, each its own group
+            self._changed: set[GroupKey] = set()  # got members since they were sorted
+            self._sorted: dict[GroupKey, list[int]] = {}  # members in ascending order of _column
+            self._releases: dict[GroupKey, list[Torrent]] = {}  # _sorted in the order shown, unfiltered
+            self._best: dict[GroupKey, int] = {}  # position of the healthiest release, unfiltered
+            self._column: Sequence = ()  # sort values the groups are sorted by
+            self._health: Sequence = ()
+            self._reverse = False
+            self.expanded: set[GroupKey] = set()
+            self.generation += 1
+            self.version += 1
+
+    def expect(self, first: int, count: int) -> None:
+        """Results added to the index at positions first.., grouped once add() gets their parses"""
+        with self._lock:
+            self._ungrouped.update(range(first, first + count))
+
+    def add(self, generation: int, first: int, parsed: Iterable[dict]) -> None:
+        """parsed: anitopy results of the positions from first"""
+        with self._lock:
+            if generation != self.generation:
+                return
+            for position, fields in enumerate(parsed, first):
+                key = episode_key(fields)
+                if key is not None:
+                    self._members.setdefault(key, []).append(position)
+                    self._changed.add(key)
+                    self._ungrouped.discard(position)
+            self.version += 1
+
+    def toggle(self, key: GroupKey) -> None:
+        self.expanded ^= {key}
+
+    def group(self, index: ResultIndex, key: str, reverse: bool = False,
+              subset: set[int] | None = None) -> list[GroupedRow]:
+        """Groups ordered by their first release in index.sorted(key, reverse, subset),
+        expanded groups are followed by their releases. The best release of a group has the highest "health"."""
+        column = index.column(key)
+        health = index.column("health")
+        with self._lock:
+            self._update(column, health, reverse)
+            groups = []
+            leads = []  # position of the first release shown of each group
+            for group_key, ordered in self._sorted.items():
+                if subset is None:
+                    releases = self._releases.get(group_key)
+                    if releases is None:
+                        releases = self._releases[group_key] = [
+                            index.torrent(position) for position in (ordered[::-1] if reverse else ordered)
+                        ]
+                    best = self._best.get(group_key)
+                    if best is None:
+                        best = self._best[group_key] = max(reversed(self._members[group_key]), key=health.__getitem__)
+                    lead = ordered[-1] if reverse else ordered[0]
+                else:
+                    matching = [position for position in ordered if position in subset]
+                    if not matching:
+                        continue
+                    releases = [index.torrent(position) for position in (matching[::-1] if reverse else matching)]
+                    best = max(sorted(matching, reverse=True), key=health.__getitem__)
+                    lead = matching[-1] if reverse else matching[0]
+                groups.append(ResultGroup(group_key, releases, index.torrent(best), group_key in self.expanded))
+                leads.append(lead)
+            for position in (self._ungrouped if subset is None else self._ungrouped & subset):
+                torrent = index.torrent(position)
+                groups.append(ResultGroup(("", "", torrent.id), [torrent], torrent))
+                leads.append(position)
+        order = sorted(range(len(leads)), key=leads.__getitem__)  # ties of the sort value by position, like ResultIndex
+        order.sort(key=lambda ix: column[leads[ix]])
+        if reverse:
+            order.reverse()
+        rows: list[GroupedRow] = []
+        for ix in order:
+            group = groups[ix]
+            rows.append(group)
+            if group.expanded:
+                rows.extend(group.releases)
+        return rows
+
+    def _update(self, column: Sequence, health: Sequence, reverse: bool) -> None:
+        """Sorts the groups that changed, or all of them for another sort key or new health scores"""
+        if column is not self._column:  # attribute columns are extended in place, scores are a new array
+            self._column, self._changed = column, set(self._members)
+        if health is not self._health:
+            self._health, self._best = health, {}
+        if reverse != self._reverse:
+            self._reverse, self._releases = reverse, {}
+        for group_key in self._changed:
+            members = self._members[group_key]
+            members.sort()  # parsed batches can come in out of order
+            self._sorted[group_key] = sorted(members, key=column.__getitem__)
+            self._releases.pop(group_key, None)
+            self._best.pop(group_key, None)
+        self._changed = set()
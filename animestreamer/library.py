@@ -0,0 +1,219 @@
+from __future__ import annotations
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple
+
+from animestreamer.filtering import normalise
+from animestreamer.grouping import GroupKey, episode_key
+from animestreamer.results import Torrent
+
+MEDIA_EXTENSIONS = (".mkv", ".mp4", ".avi", ".webm", ".m4v", ".mov", ".ts", ".wmv")
+SKIPPED = (".prebuffer",)  # Prebuffer's scratch area, only partial downloads
+SIZE_TOLERANCE = 0.05  # nyaa rounds sizes, eg "1.2 GiB"
+Release = Tuple[Optional[GroupKey], str, str]  # episode, release group, resolution
+
+
+def release(parsed: dict) -> Release:
+    resolution = normalise("video_resolution", parsed.get("video_resolution", ""))
+    return episode_key(parsed), parsed.get("release_group", "").lower(), resolution[0] if resolution else ""
+
+
+@dataclass
+class LocalFile:
+    path: str
+    size: int
+    mtime: int  # ns
+    episode: GroupKey | None
+    group: str
+    resolution: str
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+
+@dataclass
+class ScannedDirectory:
+    mtime: int  # ns, changes when files are added, removed or renamed
+    subdirectories: list[str]
+
+
+class LocalLibrary:
+    """Media files under the download path mapped to anitopy-parsed episodes, persisted in library.json.
+
+    Rescans only list directories whose mtime changed and stat the files known in the others,
+    files are parsed only when they're new or renamed. A result is local when a file has its name,
+    or the same episode, group and resolution, and (about) its size."""
+
+    def __init__(self, path: Path, parse: Callable[[str], dict]) -> None:
+        self.path = path
+        self.parse = parse
+        self.root = ""
+        self.directories: dict[str, ScannedDirectory] = {}
+        self.files: dict[str, LocalFile] = {}  # path: file
+        self.version = 0  # incremented when files change
+        self._by_name: dict[str, list[LocalFile]] = {}
+        self._by_release: dict[Release, list[LocalFile]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def load(self) -> None:
+        try:
+            content = json.loads(self.path.read_text(encoding="utf-8"))
+            self.root = content["root"]
+            self.directories = {path: ScannedDirectory(**entry) for path, entry in content["directories"].items()}
+            files = {}
+            for path, entry in content["files"].items():
+                episode = entry.pop("episode")
+                files[path] = LocalFile(path, episode=tuple(episode) if episode else None, **entry)
+            self.files = files
+        except (OSError, ValueError, KeyError, TypeError):
+            self.root, self.directories, self.files = "", {}, {}
+        self._reindex()
+
+    def save(self) -> None:
+        content = {
+            "root": self.root,
+            "directories": {path: asdict(entry) for path, entry in self.directories.items()},
+            "files": {path: {key: value for key, value in asdict(entry).items() if key != "path"}
+                      for path, entry in self.files.items()}
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(content), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def scan(self, root: str) -> int:
+        """Brings the index up to date with root, returns the number of files added, changed or removed"""
+        if root != self.root:
+            self.root, self.directories, self.files = root, {}, {}
+            self._reindex()
+            self.version += 1
+        directories: dict[str, ScannedDirectory] = {}
+        files = dict(self.files)
+        in_directory: dict[str, list[str]] = {}
+        for path in files:
+            in_directory.setdefault(os.path.dirname(path), []).append(path)
+        changed = 0
+        stack = [root] if root and os.path.isdir(root) else []
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            known = self.directories.get(directory)
+            if known is not None and known.mtime == mtime:
+                directories[directory] = known
+                stack.extend(known.subdirectories)
+                changed += self._restat(files, in_directory.get(directory, ()))
+                continue
+            scanned = directories[directory] = ScannedDirectory(mtime, [])
+            listed = set()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIPPED:
+                            scanned.subdirectories.append(entry.path)
+                        continue
+                    if not entry.name.lower().endswith(MEDIA_EXTENSIONS):
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                listed.add(entry.path)
+                old = files.get(entry.path)
+                if old is not None and old.size == stat.st_size and old.mtime == stat.st_mtime_ns:
+                    continue
+                if old is not None:
+                    files[entry.path] = replace(old, size=stat.st_size, mtime=stat.st_mtime_ns)
+                else:
+                    episode, group, resolution = release(self.parse(entry.name))
+                    files[entry.path] = LocalFile(
+                        entry.path, stat.st_size, stat.st_mtime_ns, episode, group, resolution
+                    )
+                changed += 1
+            for path in in_directory.get(directory, ()):
+                if path not in listed:  # deleted or renamed
+                    del files[path]
+                    changed += 1
+            stack.extend(scanned.subdirectories)
+        for path in [path for path in files if os.path.dirname(path) not in directories]:
+            del files[path]  # its directory is gone
+            changed += 1
+        self.directories = directories
+        if changed:
+            self.files = files
+            self._reindex()
+            self.version += 1
+        return changed
+
+    @staticmethod
+    def _restat(files: dict[str, LocalFile], paths: Iterable[str]) -> int:
+        """Files still being written (eg by webtorrent) don't change the mtime of their directory,
+        the known ones are stat'ed again. Returns the number of files that grew, shrank or are gone."""
+        changed = 0
+        for path in paths:
+            old = files[path]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del files[path]
+                changed += 1
+                continue
+            if old.size != stat.st_size or old.mtime != stat.st_mtime_ns:
+                files[path] = replace(old, size=stat.st_size, mtime=stat.st_mtime_ns)  # same name, same episode
+                changed += 1
+        return changed
+
+    def _reindex(self) -> None:
+        by_name: dict[str, list[LocalFile]] = {}
+        by_release: dict[Release, list[LocalFile]] = {}
+        for file in self.files.values():
+            by_name.setdefault(file.name.lower(), []).append(file)
+            if file.episode is not None:
+                by_release.setdefault((file.episode, file.group, file.resolution), []).append(file)
+        with self._lock:
+            self._by_name, self._by_release = by_name, by_release
+
+    def find(self, torrent: Torrent) -> LocalFile | None:
+        """The downloaded file of the torrent, batches only match by name (their names are directories)"""
+        key = release(self.parse(torrent.name)) if torrent.episodes == 1 else None
+        with self._lock:
+            candidates = self._by_name.get(torrent.name.lower(), []) + self._by_release.get(key, [])
+        for file in candidates:
+            if abs(file.size - torrent.size_bytes) <= SIZE_TOLERANCE * torrent.size_bytes:
+                return file
+        return None
+
+    def start(self, root: Callable[[], str], interval: float) -> None:
+        """Rescans root() in a background thread every `interval` seconds and when woken"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(root, interval), name="library", daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self, root: Callable[[], str], interval: float) -> None:
+        while not self._stopped.is_set():
+            try:
+                if self.scan(root()):
+                    self.save()
+            except OSError:
+                pass
+            self._wake.wait(interval)
+            self._wake.clear()
@@ -1,15 +1,25 @@
 from __future__ import annotations
+import asyncio
 
 from textual.app import App
 from textual.reactive import Reactive
+from textual.views import DockView
 
-from animestreamer.widgets import CustomHeader, Help, PathInput, Sort, TorrentInput, TorrentResults, CustomFooter
-from animestreamer import streamer
+import animestreamer
+from animestreamer.widgets import (
+    CustomHeader, FilterInput, Help, MetricsOverlay, PathInput, PageLoaded, PlaybackStatus, Sort, TorrentInput,
+    TorrentResults, WatchlistStatus, CustomFooter
+)
+from animestreamer.metrics import metrics
+
+METRICS_SIZE = 44
 
 
 class AnimeStreamer(App):
     show_help = Reactive(False)
     current_index = Reactive(0)  # index of highlighted form
+    search_task: asyncio.Task | None = None
+    more_task: asyncio.Task | None = None  # fetching further pages of the search
 
     def on_key(self, event):
         pass
@@ -23,6 +33,13 @@ class AnimeStreamer(App):
         await self.bind("ctrl+i", "escape", "Defocus")  # tab for Windows (escape broken in textual)
         await self.bind("r", "reverse", "Reverse sort")
         await self.bind("o", "parse", "Toggle parsed Torrents")
+        await self.bind("g", "group", "Group by episode")
+        await self.bind("e", "expand", "Expand episode")
+        await self.bind("s", "stop", "Stop playback")
+        await self.bind("w", "watch", "Follow search")
+        await self.bind("n", "new_episodes", "New episodes")
+        await self.bind("m", "toggle_metrics", "Metrics")
+        await self.bind("d", "dump_metrics", "Dump metrics")
         await self.bind("left", "left")
         await self.bind("right", "right")
         await self.bind("down", "down")
@@ -30,18 +47,22 @@ class AnimeStreamer(App):
 
     async def on_mount(self) -> None:
         """On startup"""
+        streamer = animestreamer.streamer
         await self.create_forms()
         await self.create_layout()
-        self.forms = (self.search_input, self.sorting, self.path_input, self.torrent_results)
+        self.forms = (self.search_input, self.filter_input, self.sorting, self.path_input, self.torrent_results)
         await self.enter_current_form()
+        streamer.watcher.start()
+        streamer.library.start(streamer.library_root, streamer.config["library_rescan"])
 
     async def on_resize(self, event) -> None:
         """Changes number of Torrents showed based on the terminal size"""
+        streamer = animestreamer.streamer
         height = event.size.height
-        show = int((height - 16) // 1.5)  # todo literally random
+        show = int((height - 19) // 1.5)  # todo literally random
         if show <= 0:
             show = 1
-        streamer.show_at_once = show
+        streamer.set_show_at_once(show)
         if self.torrent_results.selected_torrent > streamer.show_at_once:
             self.torrent_results.selected_torrent = streamer.show_at_once
 
@@ -50,38 +71,84 @@ class AnimeStreamer(App):
         self.torrent_results = TorrentResults()
         self.search_input = TorrentInput(
             name="Find torrents",
+            value=animestreamer.streamer.config["last_query"],
             placeholder="<torrent_name>",
             title="Find torrents"
         )
+        self.filter_input = FilterInput(
+            name="Filter results",
+            placeholder="<group/resolution/episode/words>",
+            title="Filter results"
+        )
         self.path_input = PathInput(
             name="Download path",
-            value=streamer.get_download_path(),
+            value=animestreamer.streamer.get_download_path(),
             title="Download path"
         )
         self.sorting = Sort()
         self.help_bar = Help(focusable=False)
+        self.playback_status = PlaybackStatus(focusable=False)
+        self.metrics_overlay = MetricsOverlay(focusable=False)
+        self.watchlist_status = WatchlistStatus(focusable=False)
 
     async def create_layout(self):
         """Puts forms into layout"""
         await self.view.dock(CustomHeader(), edge="top")
         await self.view.dock(CustomFooter(), edge="bottom")
-        await self.view.dock(self.search_input, self.sorting, self.path_input, edge="top", size=3)
+        await self.view.dock(self.search_input, self.filter_input, self.sorting, self.path_input, edge="top", size=3)
+        sidebar = DockView()
+        await self.view.dock(sidebar, edge="right", size=40)
+        await sidebar.dock(self.watchlist_status, edge="bottom", size=14)
+        await sidebar.dock(self.playback_status, edge="top")
         await self.view.dock(self.torrent_results, edge="top")
         help_size = 40
         await self.view.dock(self.help_bar, edge="left", size=help_size, z=1)
         self.help_bar.layout_offset_x = -help_size
+        await self.view.dock(self.metrics_overlay, edge="right", size=METRICS_SIZE, z=1)
+        self.metrics_overlay.layout_offset_x = METRICS_SIZE
 
     async def search(self):
-        """Searches Torrents"""
-        self.search_input.search()
-        self.sorting.sort()
-        self.torrent_results.refresh()
-        self.refresh()
+        """Searches Torrents in the background, replaces the search still running"""
+        if not self.search_input.is_new_search():
+            return
+        if self.search_task is not None:
+            self.search_task.cancel()
+        self.search_task = asyncio.create_task(self.run_search())
+
+    async def run_search(self):
+        streamer = animestreamer.streamer
+        query_id = None
+        try:
+            async for _ in self.search_input.search():
+                query_id = streamer.query_id  # the search started by the first iteration
+                await self.torrent_results.post_message(PageLoaded(self))
+        except asyncio.CancelledError:
+            if query_id == streamer.query_id:  # no other search replaced it yet
+                streamer.abandon_pages()
+            raise
+
+    def prefetch(self):
+        """Fetches the next nyaa page in the background when paging gets near the end of the results"""
+        if animestreamer.streamer.wants_more() and (self.more_task is None or self.more_task.done()):
+            self.more_task = asyncio.create_task(self.run_load_more())
+
+    async def run_load_more(self):
+        async for _ in animestreamer.streamer.load_more():
+            await self.torrent_results.post_message(PageLoaded(self))
+
+    async def handle_filter_on_change(self, message) -> None:
+        """Filters the results on every key typed into the filter"""
+        self.filter_input.filter()
+        self.torrent_results.filter()
 
     async def action_enter(self):
         """Focuses form or searches Torrent"""
         if self.search_input.has_focus:
             await self.search()
+        elif self.filter_input.has_focus:
+            self.current_index = self.forms.index(self.torrent_results)
+            await self.enter_current_form()
+            await self.torrent_results.focus()
         elif self.path_input.has_focus:
             if not self.path_input.set_path():
                 await self.action_bell()
@@ -135,6 +202,7 @@ class AnimeStreamer(App):
         """Next Torrent page or next sorting (right arrow)"""
         if self.focused == self.torrent_results:
             self.torrent_results.next_page()
+            self.prefetch()
         elif self.focused == self.sorting:
             self.sorting.next_sort()
             self.torrent_results.refresh()
@@ -146,11 +214,62 @@ class AnimeStreamer(App):
 
     async def play(self):
         """Starts playing selected Torrent"""
-        if not streamer.is_webtorrent_installed():
+        streamer = animestreamer.streamer
+        downloaded = streamer.local_file(self.torrent_results.selected_torrent_num()) is not None
+        if not downloaded and not streamer.is_webtorrent_installed():
+            streamer.players.refresh()  # might have been installed since it was looked up
+            if not streamer.is_webtorrent_installed():
+                await self.action_bell()
+                return
+        if await self.torrent_results.play_torrent() is None:
+            await self.action_bell()  # the playback panel says why
+        self.refresh()
+
+    async def action_watch(self):
+        """Follows the current search, or stops following it"""
+        if not animestreamer.streamer.query.strip():
             await self.action_bell()
             return
-        self.torrent_results.play_torrent()
-        self.refresh()
+        animestreamer.streamer.toggle_watched()
+        self.watchlist_status.refresh()
+
+    async def action_new_episodes(self):
+        """Shows the new episodes found for the watchlist as results"""
+        if animestreamer.streamer.show_new_episodes():
+            self.torrent_results.selected_torrent = 1
+            self.torrent_results.speculate()
+            self.torrent_results.refresh()
+        else:
+            await self.action_bell()
+
+    async def action_toggle_metrics(self):
+        """Shows/hides the metrics overlay, timing starts when it's first shown"""
+        overlay = self.metrics_overlay
+        overlay.shown = not overlay.shown
+        metrics.enabled = metrics.enabled or overlay.shown
+        overlay.refresh()
+        overlay.animate("layout_offset_x", 0 if overlay.shown else METRICS_SIZE)
+
+    async def action_dump_metrics(self):
+        """Writes the metrics to "metrics_path" in the config"""
+        try:
+            self.metrics_overlay.dumped_to = str(animestreamer.streamer.dump_metrics())
+        except OSError:
+            await self.action_bell()
+        self.metrics_overlay.refresh()
+
+    async def action_stop(self):
+        """Stops everything that's playing"""
+        await animestreamer.streamer.playback.stop_all()
+
+    async def action_quit(self):
+        streamer = animestreamer.streamer
+        await streamer.playback.stop_all()
+        streamer.watcher.stop()
+        streamer.library.stop()
+        await streamer.prebuffer.close()
+        streamer.config.close()
+        await self.shutdown()
 
     async def action_escape(self):
         self.search_input.set_current_search()
@@ -160,6 +279,13 @@ class AnimeStreamer(App):
     async def action_parse(self):
         self.torrent_results.toggle_parse()
 
+    async def action_group(self):
+        self.torrent_results.toggle_grouped()
+
+    async def action_expand(self):
+        if self.focused == self.torrent_results and not self.torrent_results.toggle_group():
+            await self.action_bell()
+
 
 def run():
     AnimeStreamer.run()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+import csv
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Deque, Dict, Tuple
+
+Sample = Tuple[float, float]  # (unix time, seconds)
+
+
+class NullTimer:
+    """What Metrics.timer() gives while disabled"""
+
+    def __enter__(self) -> NullTimer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class Timer:
+
+    def __init__(self, metrics: Metrics, name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> Timer:
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+
+
+class Metrics:
+    """Durations of the hot paths, the last `window` of each. Disabled it costs an attribute check per call."""
+
+    def __init__(self, enabled: bool = False, window: int = 500) -> None:
+        self.enabled = enabled
+        self.window = window
+        self.hit_rates: dict[str, Callable[[], float]] = {}  # name: hit_rate() of a cache
+        self._samples: Dict[str, Deque[Sample]] = {}
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str) -> Timer | NullTimer:
+        """with metrics.timer("name"): ..."""
+        return Timer(self, name) if self.enabled else NULL_TIMER
+
+    def timed(self, name: str) -> Callable:
+        """Decorator timing every call of the function"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append((time.time(), seconds))
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples = {}
+            self._counts = {}
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """name: count (all time), p50, p95 and max in ms of the recent samples"""
+        with self._lock:
+            recent = {name: sorted(seconds for _, seconds in samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            name: {
+                "count": counts[name],
+                "p50": percentile(durations, 50) * 1000,
+                "p95": percentile(durations, 95) * 1000,
+                "max": durations[-1] * 1000
+            }
+            for name, durations in sorted(recent.items())
+        }
+
+    def rates(self) -> dict[str, float]:
+        return {name: hit_rate() for name, hit_rate in self.hit_rates.items()}
+
+    def dump(self, path: Path) -> None:
+        """Every recent sample, as CSV (metric, time, ms) if the path ends with .csv, otherwise as JSON
+        with the summary and hit rates too"""
+        with self._lock:
+            samples = {name: list(samples) for name, samples in self._samples.items()}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix.lower() == ".csv":
+            with path.open("w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(("metric", "time", "ms"))
+                for name, name_samples in sorted(samples.items()):
+                    writer.writerows((name, f"{at:.3f}", f"{seconds * 1000:.3f}") for at, seconds in name_samples)
+            return
+        content = {
+            "summary": self.summary(),
+            "hit_rates": self.rates(),
+            "samples": {name: [[at, seconds * 1000] for at, seconds in name_samples]
+                        for name, name_samples in sorted(samples.items())}
+        }
+        path.write_text(json.dumps(content, indent=4), encoding="utf-8")
+
+
+def percentile(ordered: list[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * percent // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+metrics = Metrics()  # shared by everything timed, enabled with the "metrics" setting or the overlay
@@ -0,0 +1,39 @@
+from __future__ import annotations
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable
+
+from animestreamer.metrics import metrics
+
+ANITOPY_LOCK = threading.Lock()  # anitopy keeps its tokens in global state, parallel parses corrupt each other
+
+
+class TitleParser:
+    """anitopy.parse memoized by the raw torrent name (bounded, least recently used are dropped).
+    Titles can be parsed ahead in a worker thread so rendering only hits the cache."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.parse = lru_cache(maxsize=maxsize)(self._parse)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse")
+
+    def _parse(self, name: str) -> dict:
+        import anitopy  # on first parse, it's slow to import
+        with ANITOPY_LOCK, metrics.timer("anitopy"):
+            return anitopy.parse(name)
+
+    def preparse(self, names: Iterable[str]) -> Future:
+        """Future of the parsed titles in the order of names"""
+        names = list(names)
+        return self.executor.submit(self._parse_all, names)
+
+    def _parse_all(self, names: list[str]) -> list[dict]:
+        return [self.parse(name) for name in names]
+
+    def hit_rate(self) -> float:
+        info = self.parse.cache_info()
+        total = info.hits + info.misses
+        return info.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        self.parse.cache_clear()
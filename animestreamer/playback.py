@@ -0,0 +1,145 @@
+from __future__ import annotations
+import asyncio
+import codecs
+import os
+import signal
+import time
+from asyncio.subprocess import DEVNULL, PIPE, STDOUT, Process
+
+from animestreamer.results import Torrent
+from animestreamer.telemetry import Telemetry, TelemetryParser
+
+
+class PlaybackSession:
+    """webtorrent streaming a torrent into a player"""
+
+    def __init__(self, torrent: Torrent, process: Process, requested: float) -> None:
+        self.torrent = torrent
+        self.process = process
+        self.started = time.monotonic()
+        self.parser = TelemetryParser(requested)
+        self.follower: asyncio.Future | None = None  # reads the output, cancelled once the session is stopped
+
+    @property
+    def telemetry(self) -> Telemetry:
+        return self.parser.telemetry
+
+    @property
+    def running(self) -> bool:
+        return self.process.returncode is None
+
+    async def stop(self, timeout: float = 3) -> None:
+        """Terminates webtorrent together with the player it started, kills them if they don't exit in time"""
+        if self.running:
+            self._signal(signal.SIGTERM)
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                self._signal(signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+                await self.process.wait()
+        if self.follower is not None and self.follower is not asyncio.current_task():
+            self.follower.cancel()  # the pipe can stay open in a player that outlived webtorrent
+
+    def _signal(self, sig: int) -> None:
+        try:
+            if hasattr(os, "killpg"):  # webtorrent runs in its own process group with the player
+                os.killpg(self.process.pid, sig)
+            else:
+                self.process.send_signal(sig)
+        except ProcessLookupError:
+            pass
+
+
+class PlaybackManager:
+    """Starts webtorrent without a shell and without blocking the event loop, tracks running sessions"""
+
+    def __init__(self) -> None:
+        self.sessions: list[PlaybackSession] = []
+        self.startup_latencies: dict[str, tuple[str, float]] = {}  # torrent id: (name, seconds until the player launched)
+        self.version = 0  # incremented whenever sessions or their telemetry change
+        self.error = ""  # why the last play couldn't start, cleared by the next one that does
+
+    async def play(self, webtorrent: str, torrent: Torrent, player: str = "mpv",
+                   download_path: str = "", requested: float | None = None) -> PlaybackSession | None:
+        """requested: time.monotonic() of the key press, startup latency is measured from it.
+        Returns None if webtorrent can't be started, the reason is in `error`"""
+        requested = time.monotonic() if requested is None else requested
+        args = [webtorrent, torrent.magnet, "--not-on-top", f"--{player}"]
+        if download_path:
+            args += ["-o", download_path]
+        session = await self._launch(torrent, args, requested)
+        if session is None:
+            return None
+        self.sessions.append(session)
+        self.version += 1
+        session.follower = asyncio.ensure_future(self._follow(session))
+        return session
+
+    async def play_file(self, player: str, torrent: Torrent, path: str,
+                        requested: float | None = None) -> PlaybackSession | None:
+        """Opens a downloaded file of the torrent in the player directly, no webtorrent involved.
+        Returns None if the file or the player is gone, the reason is in `error`"""
+        requested = time.monotonic() if requested is None else requested
+        try:
+            size = os.path.getsize(path)
+        except OSError as error:
+            self._failed(path, error)
+            return None
+        session = await self._launch(torrent, [player, path], requested)
+        if session is None:
+            return None
+        telemetry = session.telemetry
+        telemetry.startup_latency = time.monotonic() - requested
+        telemetry.downloaded = telemetry.length = size
+        self.startup_latencies[torrent.id] = (torrent.name, telemetry.startup_latency)
+        self.sessions.append(session)
+        self.version += 1
+        session.follower = asyncio.ensure_future(self._follow(session))
+        return session
+
+    async def _launch(self, torrent: Torrent, args: list[str], requested: float) -> PlaybackSession | None:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=DEVNULL,
+                stdout=PIPE,
+                stderr=STDOUT,
+                start_new_session=True
+            )
+        except OSError as error:  # not installed any more, not executable, out of processes...
+            self._failed(args[0], error)
+            return None
+        self.error = ""
+        return PlaybackSession(torrent, process, requested)
+
+    def _failed(self, path: str, error: OSError) -> None:
+        self.error = f"{os.path.basename(path)}: {error.strerror or error}"
+        self.version += 1
+
+    async def _follow(self, session: PlaybackSession) -> None:
+        """Parses the output until webtorrent exits (it has to be read anyway or webtorrent blocks on a full pipe)"""
+        stdout = session.process.stdout
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        recorded = False
+        try:
+            while True:
+                chunk = await stdout.read(4096)
+                if not chunk:
+                    break
+                session.parser.feed(decoder.decode(chunk))
+                self.version += 1
+                latency = session.telemetry.startup_latency
+                if latency is not None and not recorded:
+                    self.startup_latencies[session.torrent.id] = (session.torrent.name, latency)
+                    recorded = True
+            await session.process.wait()
+        finally:
+            if session in self.sessions:
+                self.sessions.remove(session)
+                self.version += 1
+
+    def running(self) -> list[PlaybackSession]:
+        return [session for session in self.sessions if session.running]
+
+    async def stop_all(self) -> None:
+        await asyncio.gather(*(session.stop() for session in self.sessions))
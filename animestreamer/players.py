@@ -0,0 +1,56 @@
+from __future__ import annotations
+import os
+import subprocess
+import threading
+from shutil import which
+
+EXECUTABLES = ("webtorrent", "mpv", "vlc")
+
+
+class PlayerDiscovery:
+    """Resolves webtorrent and the players once and caches them.
+    They are looked up again only when PATH changes or on refresh(), versions are read in the background."""
+
+    def __init__(self, executables: tuple[str, ...] = EXECUTABLES) -> None:
+        self.executables = executables
+        self._path: str | None = None  # PATH the executables were resolved with
+        self._found: dict[str, str | None] = {}
+        self._versions: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        path = os.environ.get("PATH", "")
+        found = {name: which(name, path=path) for name in self.executables}
+        with self._lock:
+            self._path = path
+            self._found = found
+            self._versions = {}
+        threading.Thread(target=self._read_versions, args=(found,), daemon=True).start()
+
+    def which(self, name: str) -> str | None:
+        """Full path of the executable, None if it isn't installed"""
+        if self._path != os.environ.get("PATH", ""):
+            self.refresh()
+        return self._found.get(name)
+
+    def is_installed(self, name: str) -> bool:
+        return self.which(name) is not None
+
+    def version(self, name: str) -> str | None:
+        """None until the version was read (or if it couldn't be)"""
+        self.which(name)
+        return self._versions.get(name)
+
+    def _read_versions(self, found: dict[str, str | None]) -> None:
+        for name, executable in found.items():
+            if executable is None:
+                continue
+            try:
+                output = subprocess.run(
+                    [executable, "--version"], capture_output=True, text=True, timeout=5
+                ).stdout
+            except (OSError, subprocess.SubprocessError):
+                continue
+            with self._lock:
+                if self._found is found:  # not refreshed meanwhile
+                    self._versions[name] = output.strip().splitlines()[0] if output.strip() else None
@@ -0,0 +1,179 @@
+from __future__ import annotations
+import asyncio
+import codecs
+import os
+import shutil
+import time
+from asyncio.subprocess import DEVNULL, PIPE, STDOUT
+from pathlib import Path
+from typing import Iterable
+
+from animestreamer.playback import PlaybackSession
+from animestreamer.results import Torrent
+
+MIB = 1024 ** 2
+
+
+def disk_usage(directory: Path) -> int:
+    """Bytes of the files under directory"""
+    total = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class Prebuffer:
+    """Speculative webtorrent sessions for the highlighted torrent.
+
+    Once the selection rests on a torrent for `dwell` seconds, webtorrent starts fetching its metadata
+    and first `budget` bytes into root/<torrent id>, sessions of torrents no longer selected are cancelled.
+    webtorrent can't hand a running download to a player, so on Enter the session is stopped, what it fetched is
+    moved into the download path and the player's webtorrent verifies the pieces there instead of downloading them.
+    The episode is kept and indexed like any other download. Directories of torrents that aren't playing are deleted, oldest first, to keep root under `quota` bytes."""
+
+    def __init__(self, root: Path, dwell: float = 1.0, max_sessions: int = 1, budget: int = 32 * MIB,
+                 quota: int = 1024 * MIB) -> None:
+        self.root = root
+        self.dwell = dwell
+        self.max_sessions = max_sessions
+        self.budget = budget
+        self.quota = quota
+        self.sessions: dict[str, PlaybackSession] = {}  # torrent id: running speculative session
+        self.selected: str | None = None  # torrent id
+        self.launched = 0
+        self.cancelled = 0
+        self.warm = 0  # plays that found buffered data
+        self.cold = 0
+        self._pending: asyncio.TimerHandle | None = None
+
+    def directory(self, torrent: Torrent) -> Path:
+        return self.root / torrent.id
+
+    def select(self, torrent: Torrent | None, webtorrent: str | None, pinned: Iterable[str] = ()) -> None:
+        """Called whenever the selection may have moved, starts prebuffering after the dwell time.
+        pinned: ids of torrents playing from the scratch area, they're never deleted"""
+        torrent_id = None if torrent is None else torrent.id
+        if torrent_id == self.selected:
+            return
+        self.selected = torrent_id
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        for other in [key for key in self.sessions if key != torrent_id]:
+            self.cancelled += 1
+            asyncio.ensure_future(self.sessions.pop(other).stop())
+        if torrent is None or webtorrent is None or torrent_id in self.sessions:
+            return
+        loop = asyncio.get_event_loop()
+        self._pending = loop.call_later(
+            self.dwell, lambda: asyncio.ensure_future(self._start(torrent, webtorrent, set(pinned)))
+        )
+
+    async def _start(self, torrent: Torrent, webtorrent: str, pinned: set[str]) -> None:
+        self._pending = None
+        if torrent.id != self.selected or torrent.id in self.sessions:
+            return
+        while len(self.sessions) >= self.max_sessions:
+            oldest = next(iter(self.sessions))
+            self.cancelled += 1
+            await self.sessions.pop(oldest).stop()
+        directory = self.directory(torrent)
+        pinned = pinned | set(self.sessions) | {torrent.id}
+        await asyncio.get_event_loop().run_in_executor(None, self.enforce_quota, pinned)
+        directory.mkdir(parents=True, exist_ok=True)
+        os.utime(directory)  # most recently used, evicted last
+        if await asyncio.get_event_loop().run_in_executor(None, disk_usage, directory) >= self.budget:  # buffered before
+            return
+        try:
+            process = await asyncio.create_subprocess_exec(
+                webtorrent, torrent.magnet, "-o", str(directory),
+                stdin=DEVNULL,
+                stdout=PIPE,
+                stderr=STDOUT,
+                start_new_session=True
+            )
+        except OSError:
+            return
+        session = PlaybackSession(torrent, process, time.monotonic())
+        if torrent.id != self.selected:  # moved on while starting
+            self.cancelled += 1
+            await session.stop()
+            return
+        self.sessions[torrent.id] = session
+        self.launched += 1
+        session.follower = asyncio.ensure_future(self._follow(session))
+
+    async def _follow(self, session: PlaybackSession) -> None:
+        """Reads the progress, stops webtorrent once the budget is on disk"""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                chunk = await session.process.stdout.read(4096)
+                if not chunk:
+                    break
+                session.parser.feed(decoder.decode(chunk))
+                if session.telemetry.downloaded >= self.budget:
+                    await session.stop()
+                    break
+            await session.process.wait()
+        finally:
+            if self.sessions.get(session.torrent.id) is session:
+                del self.sessions[session.torrent.id]
+
+    async def take(self, torrent: Torrent, destination: str) -> bool:
+        """Stops the speculative session of the torrent and moves what it buffered into destination,
+        where the player's webtorrent is started. Returns whether anything was buffered."""
+        if self._pending is not None and self.selected == torrent.id:
+            self._pending.cancel()
+            self._pending = None
+        session = self.sessions.pop(torrent.id, None)
+        if session is not None:
+            await session.stop()
+        directory = self.directory(torrent)
+        if await asyncio.get_event_loop().run_in_executor(None, self.hand_over, directory, Path(destination)):
+            self.warm += 1
+            return True
+        self.cold += 1
+        return False
+
+    @staticmethod
+    def hand_over(directory: Path, destination: Path) -> bool:
+        """Moves the buffered files out of the scratch area, which would delete them once over the quota"""
+        if not directory.is_dir():
+            return False
+        buffered = disk_usage(directory) > 0
+        if buffered:
+            destination.mkdir(parents=True, exist_ok=True)
+            for entry in directory.iterdir():
+                target = destination / entry.name
+                if not target.exists():  # a download already there is resumed instead
+                    shutil.move(str(entry), str(target))  # a rename, the scratch area is in the download path
+        shutil.rmtree(directory, ignore_errors=True)
+        return buffered
+
+    def enforce_quota(self, pinned: set[str]) -> None:
+        """Deletes the least recently used directories until a new session's budget fits under the quota"""
+        if not self.root.is_dir():
+            return
+        directories = sorted((entry for entry in self.root.iterdir() if entry.is_dir()),
+                             key=lambda entry: entry.stat().st_mtime)
+        usage = {directory: disk_usage(directory) for directory in directories}
+        total = sum(usage.values())
+        for directory in directories:
+            if total + self.budget <= self.quota:
+                break
+            if directory.name in pinned:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= usage[directory]
+
+    async def close(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+        sessions, self.sessions = list(self.sessions.values()), {}
+        self.cancelled += len(sessions)
+        await asyncio.gather(*(session.stop() for session in sessions))
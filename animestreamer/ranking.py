@@ -0,0 +1,53 @@
+from __future__ import annotations
+from datetime import datetime
+from math import log1p
+from typing import Sequence
+
+from animestreamer.results import EPOCH, Torrent
+
+DEFAULT_WEIGHTS = {  # feature: weight, features are scaled to 0-1 over the result set first
+    "seeders": 1.0,
+    "leechers": 0.3,
+    "completed_downloads": 0.2,
+    "size_per_episode": -0.4,  # less to download per episode starts faster
+    "age": -0.3  # old swarms die out
+}
+MIB = 1024 ** 2
+DAY = 24 * 60 * 60
+
+
+def scale(column: list[float]) -> list[float]:
+    """Min-max scaling to 0-1"""
+    low, high = min(column), max(column)
+    if high == low:
+        return [0.0] * len(column)
+    span = high - low
+    return [(value - low) / span for value in column]
+
+
+def feature_columns(torrents: Sequence[Torrent], now: datetime) -> dict[str, list[float]]:
+    """Log-scaled features, one column per feature"""
+    now_timestamp = (now - EPOCH).total_seconds()
+    return {
+        "seeders": [log1p(t.seeders) for t in torrents],
+        "leechers": [log1p(t.leechers) for t in torrents],
+        "completed_downloads": [log1p(t.completed_downloads) for t in torrents],
+        "size_per_episode": [log1p(t.size_bytes / t.episodes / MIB) for t in torrents],
+        "age": [log1p(max(0.0, now_timestamp - t.timestamp) / DAY) for t in torrents]
+    }
+
+
+def health_scores(torrents: Sequence[Torrent], weights: dict[str, float] | None = None,
+                  now: datetime | None = None) -> list[float]:
+    """How fast each torrent is likely to start streaming, higher is better.
+    Computed column by column over the whole result set rather than row by row."""
+    if not torrents:
+        return []
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    now = datetime.utcnow() if now is None else now  # nyaa dates are UTC
+    scores = [0.0] * len(torrents)
+    for feature, column in feature_columns(torrents, now).items():
+        weight = weights.get(feature, 0.0)
+        if weight:
+            scores = [score + weight * value for score, value in zip(scores, scale(column))]
+    return scores
@@ -0,0 +1,279 @@
+from __future__ import annotations
+import re
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from sys import intern
+from typing import Callable, Iterable, Iterator
+
+SIZE_UNITS = {
+    "B": 1,
+    "Bytes": 1,
+    "KiB": 1024,
+    "MiB": 1024 ** 2,
+    "GiB": 1024 ** 3,
+    "TiB": 1024 ** 4
+}
+SORT_ATTRIBUTES = {  # sort key: Torrent attribute
+    "seeders": "seeders",
+    "date": "timestamp",
+    "size": "size_bytes",
+    "completed_downloads": "completed_downloads",
+    "leechers": "leechers"
+}
+EPOCH = datetime(1970, 1, 1)  # nyaa dates are UTC without a timezone
+MIN_TIMESTAMP = (datetime.min - EPOCH).total_seconds()  # of results without a valid date, the oldest
+DATE_FORMAT = re.compile(r"\d{4}-\d\d-\d\d \d\d:\d\d")  # nyaa's, formatted back from the timestamp
+MAGNET_PREFIX = "magnet:?xt=urn:btih:"
+EMPTY_ORDER = array("I")
+EPISODE_RANGE = re.compile(r"(?<![\d.])(\d{1,3})\s*[-~]\s*(\d{1,3})(?![\d.])")  # batches, eg "[01-12]", not years
+Scorer = Callable[[list], list]  # all torrents -> score of each, higher is better
+
+
+def parse_size(size: str) -> int:
+    """'1.2 GiB' -> bytes"""
+    value, _, unit = size.partition(" ")
+    try:
+        return int(float(value) * SIZE_UNITS.get(unit, 1))
+    except ValueError:
+        return 0
+
+
+def parse_date(date: str) -> float:
+    """'2022-05-10 12:34' -> seconds since 1970"""
+    try:
+        return (datetime.fromisoformat(date) - EPOCH).total_seconds()
+    except (TypeError, ValueError):  # TypeError: with a timezone
+        return MIN_TIMESTAMP
+
+
+def parse_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def compact_magnet(magnet: str) -> tuple[int | None, str, str]:
+    """(info hash, display name, interned trackers) of a magnet built like nyaa's, (None, magnet, "") otherwise"""
+    info_hash, dn, rest = magnet[len(MAGNET_PREFIX):].partition("&dn=")
+    display_name, tracker, trackers = rest.partition("&tr=")
+    if not magnet.startswith(MAGNET_PREFIX) or not dn or len(info_hash) != 40 or info_hash.lower() != info_hash:
+        return None, magnet, ""
+    try:
+        return int(info_hash, 16), display_name, intern(tracker + trackers)
+    except ValueError:
+        return None, magnet, ""
+
+
+def parse_episodes(name: str) -> int:
+    """Number of episodes in a batch, 1 if the name doesn't contain an episode range"""
+    for match in EPISODE_RANGE.finditer(name):
+        first, last = map(int, match.groups())
+        if first < last:
+            return last - first + 1
+    return 1
+
+
+class Torrent:
+    """Search result normalised once when it's added to the index.
+
+    Deep searches keep a lot of them, so they're slotted and only what can't be rebuilt is stored:
+    category and size strings are interned, the view url keeps an interned prefix before the id,
+    nyaa magnets keep the info hash as a number, the display name and interned trackers,
+    dates are seconds since 1970 and the date string is formatted back when it's shown."""
+    __slots__ = ("id", "name", "category", "size", "size_bytes", "timestamp", "seeders", "leechers",
+                 "completed_downloads", "episodes", "_url", "_url_ends_with_id", "_info_hash", "_magnet",
+                 "_trackers", "_date")
+
+    def __init__(self, id: str, name: str, url: str, magnet: str, category: str, size: str, date: str,
+                 seeders: int, leechers: int, completed_downloads: int, episodes: int = 1) -> None:
+        self.id = id
+        self.name = name
+        self.category = intern(category)
+        self.size = intern(size)  # as shown by nyaa, eg "1.2 GiB"
+        self.size_bytes = parse_size(size)
+        self.timestamp = parse_date(date)  # seconds since 1970, UTC like nyaa's dates
+        self.seeders = seeders
+        self.leechers = leechers
+        self.completed_downloads = completed_downloads
+        self.episodes = episodes
+        self._url_ends_with_id = bool(id) and url.endswith(f"/{id}")
+        self._url = intern(url[:-len(id)]) if self._url_ends_with_id else url  # eg "https://nyaa.si/view/"
+        self._info_hash, self._magnet, self._trackers = compact_magnet(magnet)  # _magnet: display name or magnet
+        canonical = DATE_FORMAT.fullmatch(date) and self.timestamp != MIN_TIMESTAMP
+        self._date = None if canonical else date  # formatted from timestamp if None
+
+    @property
+    def url(self) -> str:
+        return self._url + self.id if self._url_ends_with_id else self._url
+
+    @property
+    def magnet(self) -> str:
+        if self._info_hash is None:
+            return self._magnet
+        return f"{MAGNET_PREFIX}{self._info_hash:040x}&dn={self._magnet}{self._trackers}"
+
+    @property
+    def date(self) -> str:
+        if self._date is not None:
+            return self._date
+        return (EPOCH + timedelta(seconds=self.timestamp)).strftime("%Y-%m-%d %H:%M")
+
+    def __repr__(self) -> str:
+        return f"Torrent(id={self.id!r}, name={self.name!r})"
+
+    @classmethod
+    def from_nyaa(cls, result: dict) -> Torrent:
+        return cls(
+            id=result["id"],
+            name=result["name"],
+            url=result.get("url", ""),
+            magnet=result["magnet"],
+            category=result.get("category") or "",
+            size=result["size"],
+            date=result["date"],
+            seeders=parse_int(result["seeders"]),
+            leechers=parse_int(result["leechers"]),
+            completed_downloads=parse_int(result["completed_downloads"]),
+            episodes=parse_episodes(result["name"])
+        )
+
+
+class ResultView(Sequence):
+    """Results in the order of a cached permutation of the index, nothing is copied"""
+
+    def __init__(self, torrents: list[Torrent], order: Sequence[int], reverse: bool = False) -> None:
+        self._torrents = torrents
+        self._order = order
+        self._reverse = reverse
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, ix):
+        if isinstance(ix, slice):
+            return [self[i] for i in range(*ix.indices(len(self)))]
+        if ix < 0:
+            ix += len(self)
+        if not 0 <= ix < len(self):
+            raise IndexError("result index out of range")
+        return self._torrents[self._order[-1 - ix] if self._reverse else self._order[ix]]
+
+
+class FilteredView(Sequence):
+    """Results of a sorted permutation that are in a subset of positions.
+    Filtered lazily only as far as it's read, the first page doesn't walk the whole permutation."""
+
+    def __init__(self, torrents: list[Torrent], order: Sequence[int], subset: set[int], reverse: bool = False) -> None:
+        self._torrents = torrents
+        self._positions = iter(reversed(order) if reverse else order)
+        self._subset = subset
+        self._matched: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._subset)
+
+    def __getitem__(self, ix):
+        if isinstance(ix, slice):
+            return [self[i] for i in range(*ix.indices(len(self)))]
+        if ix < 0:
+            ix += len(self)
+        if not 0 <= ix < len(self):
+            raise IndexError("result index out of range")
+        matched = self._matched
+        if len(matched) <= ix:
+            for position in self._positions:
+                if position in self._subset:
+                    matched.append(position)
+                    if len(matched) > ix:
+                        break
+        return self._torrents[matched[ix]]
+
+
+class ResultIndex:
+    """Results keyed by torrent id in insertion order.
+    Duplicates are dropped on insert, so pages, queries and cached pages can be merged without rescanning.
+    Sorted permutations are cached per sort key, reversing or switching back to a key is free.
+    scorers: extra sort keys scored over the whole result set, recomputed when results are added."""
+
+    def __init__(self, scorers: dict[str, Scorer] | None = None) -> None:
+        self.scorers = scorers or {}
+        self._by_id: dict[str, Torrent] = {}
+        self._torrents: list[Torrent] = []
+        self._columns: dict[str, Sequence] = {}  # sort key: values of every torrent
+        self._orders: dict[str, Sequence[int]] = {}  # sort key: ascending permutation of torrents, 4 bytes a position
+
+    def add(self, results: Iterable[dict]) -> list[Torrent]:
+        """Returns the results that weren't in the index yet"""
+        added = [Torrent.from_nyaa(result) for result in self.unseen(results)]
+        self._by_id.update((torrent.id, torrent) for torrent in added)
+        self._torrents.extend(added)
+        return added
+
+    def unseen(self, results: Iterable[dict]) -> list[dict]:
+        """The raw results whose ids aren't in the index, the first of duplicates within results.
+        Only ids are looked at, the records are built by add() for what's left."""
+        known = self._by_id
+        fresh: dict[str, dict] = {}
+        for result in results:
+            torrent_id = result["id"]
+            if torrent_id not in known and torrent_id not in fresh:
+                fresh[torrent_id] = result
+        return list(fresh.values())
+
+    def sorted(self, key: str, reverse: bool = False, subset: set[int] | None = None) -> Sequence[Torrent]:
+        """keys: seeders, date, size, completed_downloads, leechers and the scorers
+        subset: positions of the torrents to keep (see FilterIndex), all are kept if None"""
+        order = self._order(key)
+        if subset is not None and len(subset) * 32 < len(order):  # sorting a few matches beats walking the order
+            column = self._columns[key]
+            return ResultView(self._torrents, sorted(sorted(subset), key=column.__getitem__), reverse)
+        if subset is not None:
+            return FilteredView(self._torrents, order, subset, reverse)
+        return ResultView(self._torrents, order, reverse)
+
+    def _order(self, key: str) -> Sequence[int]:
+        order = self._orders.get(key, EMPTY_ORDER)
+        if len(order) == len(self._torrents):
+            return order
+        if key in self.scorers:
+            # a score depends on the other results, so it can't be extended like a column
+            column = self._columns[key] = array("d", self.scorers[key](self._torrents))
+            positions = list(range(len(self._torrents)))
+        else:
+            column = self._columns.setdefault(key, [])  # shares the numbers of the torrents
+            attribute = SORT_ATTRIBUTES[key]
+            column.extend(getattr(t, attribute) for t in self._torrents[len(column):])
+            positions = order.tolist()
+            positions.extend(range(len(order), len(self._torrents)))
+        positions.sort(key=column.__getitem__)  # already sorted runs are merged, not sorted again
+        order = self._orders[key] = array("I", positions)  # views made before keep the permutation they had
+        return order
+
+    def column(self, key: str) -> Sequence:
+        """Sort values of key by insertion position, ResultIndex.sorted orders by them with ties by position"""
+        self._order(key)
+        return self._columns.get(key, EMPTY_ORDER)
+
+    def torrent(self, position: int) -> Torrent:
+        """Torrent at an insertion position (see FilterIndex)"""
+        return self._torrents[position]
+
+    def get(self, torrent_id: str) -> Torrent | None:
+        return self._by_id.get(torrent_id)
+
+    def clear(self) -> None:
+        self._by_id = {}
+        self._torrents = []
+        self._columns = {}
+        self._orders = {}
+
+    def __contains__(self, torrent_id: str) -> bool:
+        return torrent_id in self._by_id
+
+    def __iter__(self) -> Iterator[Torrent]:
+        return iter(self._torrents)
+
+    def __len__(self) -> int:
+        return len(self._torrents)
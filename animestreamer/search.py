@@ -0,0 +1,112 @@
+from __future__ import annotations
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+Fetch = Callable[[str, int], list]  # (query, page) -> results of the page
+PAGE_SIZE = 75  # results on a full nyaa page
+FIRST_PAGE = 1  # nyaa serves page 1 for page 0 too
+
+
+class SearchJob:
+    """Pages of one query fetched concurrently. Pages that fail, or aren't fetched within `timeout`
+    seconds of the start, end up in `failed` while the rest are still delivered."""
+
+    def __init__(self, query: str, pages: Iterable[int], fetch: Fetch, executor: ThreadPoolExecutor,
+                 timeout: float | None = None) -> None:
+        self.query = query
+        self.timeout = timeout
+        self.started = time.monotonic()
+        self.failed: dict[int, BaseException] = {}  # page: error
+        self._cancelled = threading.Event()
+        self._fetch = fetch
+        self._futures: dict[Future, int] = {
+            executor.submit(self._fetch_page, page): page for page in pages
+        }
+
+    def _fetch_page(self, page: int) -> list:
+        if self.cancelled:
+            return []
+        return self._fetch(self.query, page)
+
+    @property
+    def page_count(self) -> int:
+        return len(self._futures)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Pages that haven't started are dropped, requests in flight are ignored once they finish"""
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel()
+
+    def remaining(self) -> float | None:
+        """Seconds until the job gives up on the pages still being fetched"""
+        if self.timeout is None:
+            return None
+        return max(0.0, self.started + self.timeout - time.monotonic())
+
+    def as_completed(self) -> Iterator[tuple[int, list]]:
+        """Yields (page, results) in the order the pages arrive, failed pages are skipped"""
+        try:
+            for future in as_completed(self._futures, timeout=self.remaining()):
+                if self.cancelled:
+                    return
+                page = self._futures[future]
+                if future.exception() is not None:
+                    self.failed[page] = future.exception()
+                    continue
+                yield page, future.result()
+        except FutureTimeout:
+            self._give_up(self._futures)
+
+    async def as_completed_async(self) -> AsyncIterator[tuple[int, list]]:
+        """as_completed() that waits on the event loop instead of blocking it"""
+        pending = {asyncio.wrap_future(future): page for future, page in self._futures.items()}
+        while pending and not self.cancelled:
+            done, _ = await asyncio.wait(pending, timeout=self.remaining(), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                self._give_up(pending)
+                return
+            for future in done:
+                page = pending.pop(future)
+                if self.cancelled:
+                    return
+                if future.exception() is not None:
+                    self.failed[page] = future.exception()
+                    continue
+                yield page, future.result()
+
+    def _give_up(self, futures: dict) -> None:
+        """The request of a page that timed out keeps its worker until the backend gives up too"""
+        for future, page in futures.items():
+            if not future.done():
+                future.cancel()
+                self.failed[page] = TimeoutError(f"no response in {self.timeout:g} s")
+
+
+class SearchEngine:
+    """Fetches search pages in parallel on a bounded thread pool"""
+
+    def __init__(self, fetch: Fetch, max_workers: int = 6, timeout: float | None = None) -> None:
+        self.fetch = fetch
+        self.timeout = timeout  # seconds a search waits for its pages
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search")
+        self.job: SearchJob | None = None
+
+    def start(self, query: str, pages: Iterable[int]) -> SearchJob:
+        """Starts a new search, the one still running (if any) is cancelled"""
+        self.cancel()
+        self.job = SearchJob(query, pages, self.fetch, self.executor, self.timeout)
+        return self.job
+
+    def cancel(self) -> None:
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
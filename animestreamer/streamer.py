@@ -1,92 +1,386 @@
 ﻿from __future__ import annotations
 import os
-import json
+import tempfile
+import time
 import appdirs
-import anitopy
-from shutil import which
+from concurrent.futures import Future
+from functools import partial
 from pathlib import Path
-
-from NyaaPy import Nyaa
+from typing import AsyncIterator, Iterator, Sequence
 
 from rich.console import Console
-from rich.table import Table
-from rich.progress import track
+from rich.markup import escape
+
+from animestreamer.backends import create_backend
+from animestreamer.cache import SearchCache
+from animestreamer.config import ConfigStore
+from animestreamer.fetching import ResilientFetch, TokenBucket
+from animestreamer.filtering import FilterIndex
+from animestreamer.grouping import EpisodeGroups, GroupedRow, ResultGroup
+from animestreamer.library import LocalFile, LocalLibrary
+from animestreamer.metrics import metrics
+from animestreamer.parsing import TitleParser
+from animestreamer.playback import PlaybackManager, PlaybackSession
+from animestreamer.players import PlayerDiscovery
+from animestreamer.prebuffer import MIB, Prebuffer
+from animestreamer.ranking import DEFAULT_WEIGHTS, health_scores
+from animestreamer.results import ResultIndex, Torrent
+from animestreamer.search import FIRST_PAGE, PAGE_SIZE, SearchEngine, SearchJob
+from animestreamer.table import ResultsTable, RowCache
+from animestreamer.watchlist import Watchlist, WatchlistPoller
 
 CONFIG_DIR = Path(appdirs.user_config_dir(appname="animestreamer"))
-CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-config = CONFIG_DIR / "config.json"
-if not config.exists():
-    with config.open("w") as f:
-        json.dump({"download_path": ""}, f, indent=4)
+DEFAULT_CONFIG = {
+    "download_path": "",
+    "cache_ttl": 3600,  # seconds until cached search pages are revalidated
+    "cache_size": 120,  # max number of cached search pages
+    "cache_revalidate": True,  # serve expired pages and fetch them again in the background
+    "ranking_weights": DEFAULT_WEIGHTS,  # weights of the "health" sort, see ranking.py
+    "last_query": "",
+    "sort_key": "seeders",
+    "sort_reverse": True,
+    "pages": 6,  # max pages searched up front (75 results per page), more are fetched when paging past the end
+    "parsed": True,  # show parsed torrent titles
+    "grouped": False,
+    "show_at_once": 10,
+    "player": "mpv",  # webtorrent player flag, eg mpv, vlc
+    "backend": "nyaapy",  # nyaapy (scrapes the HTML) or rss
+    "backend_url": "",  # where the rss backend connects, eg a local mock server, nyaa.si if empty
+    "fetch_timeout": 10,  # seconds per request (rss backend)
+    "fetch_retries": 3,  # failed requests are retried with a jittered exponential backoff
+    "page_deadline": 20,  # seconds a search waits for a page including retries, the other pages show meanwhile
+    "rate_limit": 2,  # requests per second on average, 0 for no limit
+    "rate_burst": 6,  # requests at once after being idle
+    "metrics": False,  # time the hot paths from the start, otherwise once the overlay (M) is shown
+    "metrics_path": "",  # where D dumps the metrics, .csv or .json, metrics.json next to this file if empty
+    "watch_interval": 900,  # seconds between checks of the watchlist for new episodes, 0 to never check
+    "prebuffer": False,  # start fetching the highlighted torrent before Enter is pressed
+    "prebuffer_dwell": 1.0,  # seconds the selection has to rest on a torrent
+    "prebuffer_sessions": 1,  # speculative webtorrent processes at once
+    "prebuffer_mb": 32,  # fetched per torrent ahead of Enter
+    "prebuffer_quota_mb": 1024,  # disk space of the scratch area (.prebuffer in the download path)
+    "library_rescan": 60  # seconds between looking for changes in the download path
+}
 
 
 class AnimeStreamer:
 
     def __init__(self) -> None:
         self.console = Console()
-        self.results = []
-        self.nyaa = Nyaa
-        self.show_at_once = 10
+        self.config = ConfigStore(CONFIG_DIR / "config.json", DEFAULT_CONFIG)  # written back in the background
+        self.config.load()
+        metrics.enabled = self.config["metrics"]
+        weights = {**DEFAULT_WEIGHTS, **self.config["ranking_weights"]}
+        self.index = ResultIndex(scorers={"health": partial(health_scores, weights=weights)})  # results by torrent id
+        self.parser = TitleParser()
+        self.filters = FilterIndex()  # filter-as-you-type over the fetched results
+        self.filter_query = ""
+        self.groups = EpisodeGroups()
+        self.grouped = self.config["grouped"]  # one row per episode with its healthiest release
+        self.row_cache = RowCache()
+        self.players = PlayerDiscovery()
+        self.players.refresh()
+        self.playback = PlaybackManager()
+        self.backend = create_backend(  # where pages come from
+            self.config["backend"], self.config["backend_url"], self.config["fetch_timeout"]
+        )
+        self.limiter = TokenBucket(self.config["rate_limit"], self.config["rate_burst"])  # shared by all requests
+        self.fetcher = ResilientFetch(
+            self.limiter, retries=self.config["fetch_retries"], deadline=self.config["page_deadline"]
+        )
+        self.show_at_once = self.config["show_at_once"]
         self.curr_page = 0
-        self.pages = 6  # number of pages searched (75 results per page)
-        with config.open(encoding="utf-8-sig") as f:
-            self.download_path = json.load(f)["download_path"]
+        self.pages = self.config["pages"]  # max pages searched up front (75 results per page)
+        self.prefetch_pages = 2  # screen pages from the end of the results when the next nyaa page is fetched
+        self.query = ""
+        self.query_id = 0  # incremented with every new query
+        self.next_nyaa_page = FIRST_PAGE
+        self.exhausted = True  # nyaa has no more results for the query
+        self.advance_when_loaded = False  # next_page was pressed on the last page while loading more
+        self.fetching_more = False  # load_more is running
+        self.failed_pages: list[int] = []  # nyaa pages that failed, fetched again with the next batch
+        self.fetch_error = ""  # the last one
+        self.in_flight: dict[int, bool] = {}  # nyaa pages being fetched: whether they failed before
+        self.sort_key = self.config["sort_key"]
+        self.sort_reverse = self.config["sort_reverse"]
+        self.player = self.config["player"]
+        self.parsed = self.config["parsed"]  # titles shown parsed by anitopy
+        self.loaded_pages = 0
+        self.expected_pages = 0  # pages of the current search, loading until all are loaded
+        self.results = self.index.sorted(self.sort_key, self.sort_reverse)
+        self.rows: Sequence[GroupedRow] = self.results  # what's paged through, groups when grouped
+        self.filtered_version = self.filters.version  # filter index version the results were filtered with
+        self.grouped_version = self.groups.version
+        self.engine = SearchEngine(fetch=self.fetch_page, max_workers=self.pages, timeout=self.config["page_deadline"])
+        self.download_path = self.config["download_path"]
+        self.prebuffer = Prebuffer(
+            self.prebuffer_root(),
+            dwell=self.config["prebuffer_dwell"],
+            max_sessions=self.config["prebuffer_sessions"],
+            budget=self.config["prebuffer_mb"] * MIB,
+            quota=self.config["prebuffer_quota_mb"] * MIB
+        )
+        self.cache = SearchCache(
+            CONFIG_DIR / "search_cache.json",
+            ttl=self.config["cache_ttl"],
+            max_entries=self.config["cache_size"],
+            revalidate=self.config["cache_revalidate"]
+        )
+        self.library = LocalLibrary(CONFIG_DIR / "library.json", self.parser.parse)  # what's already downloaded
+        self.library.load()
+        self.watchlist = Watchlist(CONFIG_DIR / "watchlist.json")  # shows checked for new episodes
+        self.watchlist.load()
+        self.watcher = WatchlistPoller(
+            self.watchlist,
+            fetch=lambda query: self.fetcher(self.backend.search, query, FIRST_PAGE),
+            parse=self.parser.parse,
+            interval=self.config["watch_interval"]
+        )  # started by the app
+        metrics.hit_rates.update({
+            "search cache": lambda: self.cache.hit_rate(),
+            "parse cache": lambda: self.parser.hit_rate(),
+            "row cache": lambda: self.row_cache.hit_rate()
+        })
 
-    @staticmethod
-    def is_webtorrent_installed() -> bool:
-        return which("webtorrent") is not None
+    def is_webtorrent_installed(self) -> bool:
+        return self.players.is_installed("webtorrent")
+
+    def fetch_page(self, text: str, page: int) -> list:
+        """Cached page if there is one, expired pages are fetched again in the background"""
+        cached = self.cache.get(text, page)
+        if cached is None:
+            return self.refresh_page(text, page)
+        results, stale = cached
+        if stale:
+            self.engine.executor.submit(self.refresh_page, text, page)
+        return results
+
+    @metrics.timed("fetch page")
+    def refresh_page(self, text: str, page: int) -> list:
+        """Fetches the page from the search backend and caches it, retries failed requests"""
+        results = self.fetcher(self.backend.search, text, page)
+        self.cache.put(text, page, results)
+        return results
+
+    def start_query(self, text: str) -> None:
+        """Clears the results of the previous query, cancels its search"""
+        self.engine.cancel()
+        self.config.set("last_query", text)
+        self.query = text
+        self.query_id += 1
+        self.next_nyaa_page = FIRST_PAGE
+        self.clear_results()
+        self.exhausted = False
+
+    def next_batches(self, pages: int) -> Iterator[list[int]]:
+        """Next nyaa pages to fetch concurrently, in batches doubling in size (1, 2, 4...) up to `pages` pages.
+        Stops once a page was short or only had duplicates, so small queries cost a single request.
+        Pages that failed before go first."""
+        batch_size = 1
+        while pages > 0 and (self.failed_pages or not self.exhausted):
+            size = min(batch_size, pages)
+            batch, self.failed_pages = self.failed_pages[:size], self.failed_pages[size:]
+            self.in_flight.update((page, True) for page in batch)
+            if not self.exhausted:
+                new = range(self.next_nyaa_page, self.next_nyaa_page + size - len(batch))
+                self.next_nyaa_page = new.stop
+                self.in_flight.update((page, False) for page in new)
+                batch.extend(new)
+            self.expected_pages += len(batch)
+            yield batch
+            pages -= len(batch)
+            batch_size *= 2
+
+    def add_failures(self, job: SearchJob) -> bool:
+        """Keeps the failed pages of a batch for the next one, True if all of them failed"""
+        for page, error in sorted(job.failed.items()):
+            self.failed_pages.append(page)
+            self.in_flight.pop(page, None)
+            self.fetch_error = f"page {page}: {error}"
+        self.expected_pages -= len(job.failed)
+        return len(job.failed) == job.page_count
 
     def search(self, text: str) -> None:
-        self.results = []
-        for page in track(range(self.pages), description="Searching..."):
-            self.results.extend(self.nyaa.search(keyword=text, page=page))
-        # NyaaPy gives duplicates
-        ids = set()
-        to_remove = []
-        for r in self.results:
-            if r["id"] in ids:
-                to_remove.append(r)
-            ids.add(r["id"])
-        for r in to_remove:
-            self.results.remove(r)
+        """Blocks until the pages searched up front are fetched"""
+        for _ in self.search_pages(text):
+            pass
+        self.cache.save()
+
+    def search_pages(self, text: str) -> Iterator[tuple[int, list, list[Torrent]]]:
+        """search() that yields (nyaa page, its raw results, the torrents it added) as each page is merged.
+        Closing the iterator early cancels the pages still being fetched."""
+        self.start_query(text)
+        try:
+            for batch in self.next_batches(self.pages):
+                job = self.engine.start(text, batch)
+                for page, results in job.as_completed():
+                    self.in_flight.pop(page, None)
+                    yield page, results, self.add_page(results)
+                if self.add_failures(job):  # nyaa is down or throttling, no use going deeper
+                    break
+        finally:
+            self.engine.cancel()
+
+    async def search_async(self, text: str) -> AsyncIterator[int]:
+        """Merges pages into results as they arrive without blocking the event loop.
+        Yields the number of pages loaded so far, starting with 0 once the old results are cleared."""
+        self.start_query(text)
+        yield self.loaded_pages
+        async for loaded_pages in self.load_more(self.pages):
+            yield loaded_pages
+
+    async def load_more(self, pages: int = 1) -> AsyncIterator[int]:
+        """Fetches up to `pages` more pages of the current query, yields the number of loaded pages"""
+        query_id = self.query_id
+        self.fetching_more = True
+        try:
+            for batch in self.next_batches(pages):
+                job = self.engine.start(self.query, batch)
+                async for page, results in job.as_completed_async():
+                    self.in_flight.pop(page, None)
+                    self.add_page(results)
+                    yield self.loaded_pages
+                if job.cancelled:  # another search started
+                    return
+                if self.add_failures(job):  # nyaa is down or throttling, tried again when paging on
+                    break
+        finally:
+            if query_id == self.query_id:  # a cancelled search can finish after the next one started
+                self.fetching_more = False
+        self.engine.executor.submit(self.cache.save)
 
+    def abandon_pages(self) -> None:
+        """After a load of the current query was cancelled: pages it didn't merge are fetched by the next load,
+        nyaa pages from the first unfinished one on and the failed pages it retried"""
+        self.engine.cancel()
+        new = [page for page, retried in self.in_flight.items() if not retried]
+        self.failed_pages = sorted(page for page, retried in self.in_flight.items() if retried) + self.failed_pages
+        if new:
+            self.next_nyaa_page = min(new)  # pages merged after it are deduplicated when fetched again
+            self.exhausted = False
+        self.expected_pages -= len(self.in_flight)
+        self.in_flight = {}
+        self.fetching_more = False
+
+    def wants_more(self) -> bool:
+        """The user is near the end of the results and nyaa might have more"""
+        if (self.exhausted and not self.failed_pages) or self.fetching_more:
+            return False
+        rows_left = len(self.rows) - (self.curr_page + 1) * self.show_at_once
+        return rows_left < self.prefetch_pages * self.show_at_once
+
+    def clear_results(self, expected_pages: int = 0) -> None:
+        self.index.clear()
+        self.filters.clear()
+        self.groups.clear()
+        self.resort()
+        self.curr_page = 0
+        self.loaded_pages = 0
+        self.expected_pages = expected_pages
+        self.exhausted = True
+        self.advance_when_loaded = False
+        self.failed_pages = []
+        self.fetch_error = ""
+        self.in_flight = {}
+
+    def add_page(self, results: list) -> list[Torrent]:
+        """Merges a fetched page into results, keeps them deduplicated and sorted. Returns the new torrents."""
+        added = self.index.add(results)  # NyaaPy gives duplicates
+        first = len(self.index) - len(added)
+        self.filters.add_names(first, (t.name for t in added))
+        self.groups.expect(first, len(added))
+        parsing = self.parser.preparse(t.name for t in added)
+        parsing.add_done_callback(partial(self.index_parsed, self.filters.generation, self.groups.generation, first))
+        self.resort()
+        self.loaded_pages += 1
+        if len(results) < PAGE_SIZE or not added:  # last page, or nyaa repeats itself
+            self.exhausted = True
+        if self.advance_when_loaded and self.curr_page < self.get_page_count():
+            self.curr_page += 1
+            self.advance_when_loaded = False
+        return added
+
+    def index_parsed(self, generation: int, groups_generation: int, first: int, parsing: Future) -> None:
+        """Adds parsed titles to the filter index and the episode groups, runs in the parse worker"""
+        if parsing.exception() is None:
+            self.filters.add_fields(generation, first, parsing.result())
+            self.groups.add(groups_generation, first, parsing.result())
+
+    def is_loading(self) -> bool:
+        return self.loaded_pages < self.expected_pages
+
+    @metrics.timed("sort")
     def sort_results(self, key: str, reverse: bool = False) -> None:
-        """keys: seeders, date, size, completed_downloads, leechers"""
-        if key == "size":
-            size_dict = {
-                "KiB": 1,
-                "MiB": 1_000,
-                "GiB": 1_000_000
-            }
-            sort_lambda = lambda d: size_dict[d[key].split()[1]] * float(d[key].split()[0])
-        elif key == "date":
-            sort_lambda = lambda d: d[key]
+        """keys: seeders, date, size, completed_downloads, leechers, health"""
+        self.sort_key = key
+        self.sort_reverse = reverse
+        self.config.update(sort_key=key, sort_reverse=reverse)
+        subset = None
+        if self.filter_query.strip():
+            with metrics.timer("filter"):
+                subset = self.filters.match(self.filter_query)
+        self.results = self.index.sorted(key, reverse, subset)
+        self.filtered_version = self.filters.version
+        if self.grouped:
+            self.rows = self.groups.group(self.index, key, reverse, subset)
         else:
-            sort_lambda = lambda d: int(d[key])
-        self.results = sorted(self.results, key=sort_lambda, reverse=reverse)
+            self.rows = self.results
+        self.grouped_version = self.groups.version
+
+    def filter_results(self, query: str) -> None:
+        """Keeps only the results matching the query, eg "SubsPlease 1080p E05", empty query keeps all"""
+        if query != self.filter_query:
+            self.filter_query = query
+            self.curr_page = 0
+            self.resort()
+
+    def toggle_grouped(self) -> None:
+        self.grouped = not self.grouped
+        self.config.set("grouped", self.grouped)
+        self.curr_page = 0
+        self.resort()
+
+    def toggle_group(self, row_num: int) -> bool:
+        """Expands or collapses the group on the row, returns False if there's nothing to expand"""
+        if not self.grouped or not 0 < row_num <= len(self.rows):
+            return False
+        row = self.rows[row_num - 1]
+        if not isinstance(row, ResultGroup) or len(row.releases) < 2:
+            return False
+        self.groups.toggle(row.key)
+        self.resort()
+        return True
+
+    def are_rows_outdated(self) -> bool:
+        """Titles were parsed since the rows were made, which changes filtered and grouped rows"""
+        if self.filter_query.strip() and self.filtered_version != self.filters.version:
+            return True
+        return self.grouped and self.grouped_version != self.groups.version
 
-    def get_results_table(self, selected: int, parsed: bool) -> Table:
+    def resort(self) -> None:
+        """Sorts results by the last used sorting"""
+        self.sort_results(self.sort_key, self.sort_reverse)
+
+    def get_results_table(self, selected: int, parsed: bool) -> ResultsTable:
         """Returns a table of torrents from the current page."""
-        table = Table()
-        if not self.results:
-            return table
-        table.add_column("Num", style="red")
-        table.add_column("Name")
-        table.add_column("Size")
-        table.add_column("Seeders")
-        table.add_column("Date")
-        for i, res in enumerate(self.top_results()):
+        rows = []
+        for i, row in enumerate(self.top_results()):
             num = i + 1 + (self.curr_page * self.show_at_once)
-            title = self.parse_torrent(res["name"]) if parsed else res["name"]
-            if i + 1 == selected:
-                torrent_name = self.colored(title, "bold red")
-            else:
-                torrent_name = title
-            table.add_row(str(num), torrent_name, res["size"], res["seeders"], res["date"])
-        return table
+            res = row.best if isinstance(row, ResultGroup) else row
+            title = self.parse_torrent(res.name) if parsed else escape(res.name)
+            if self.library.find(res) is not None:
+                title = f"[green]●[/green] {title}"  # downloaded, plays from the disk
+            if isinstance(row, ResultGroup) and len(row.releases) > 1:
+                marker = "▾" if row.expanded else "▸"
+                title = f"{marker} [magenta]+{len(row.releases) - 1}[/magenta] {title}"  # before the title, it's cropped
+            elif self.grouped and not isinstance(row, ResultGroup):
+                title = f"  └ {title}"  # release of the expanded group above
+            rows.append((str(num), title, res.size, str(res.seeders), res.date))
+        return ResultsTable(rows, selected, self.row_cache)
 
+    @metrics.timed("parse title")
     def parse_torrent(self, name: str) -> str:
-        parsed = anitopy.parse(name)
+        parsed = self.parser.parse(name)
         keys = {    # key: (colour, prefix, suffix)
             "anime_title": (None, "", ""),
             "anime_season": ("yellow", "[S", "]"),
@@ -115,18 +409,58 @@ class AnimeStreamer:
         return f"[{col}]{text}[/{col}]"
 
     def top_results(self) -> list:
-        """Returns 'show_at_once' results from the current page"""
+        """Returns 'show_at_once' rows from the current page (results or groups)"""
         page_start_ix = self.curr_page * self.show_at_once
         page_end_ix = page_start_ix + self.show_at_once
-        return self.results[page_start_ix:page_end_ix]
+        return self.rows[page_start_ix:page_end_ix]
+
+    async def play_torrent(self, torrent_num: int, player: str | None = None) -> PlaybackSession | None:
+        """Starts streaming in the background, returns None if it can't be played"""
+        requested = time.monotonic()
+        player = self.player if player is None else player
+        torrent = self.torrent_at(torrent_num)
+        if torrent is None:
+            return None
+        local = self.local_file(torrent_num)
+        if local is not None and self.players.is_installed(player):
+            return await self.playback.play_file(self.players.which(player), torrent, local.path, requested)
+        if not self.is_webtorrent_installed():
+            return None
+        webtorrent = self.players.which("webtorrent")
+        if self.config["prebuffer"] and await self.prebuffer.take(torrent, self.library_root()):
+            self.library.wake()  # indexes the moved files
+        return await self.playback.play(webtorrent, torrent, player, self.download_path, requested)
+
+    def torrent_at(self, torrent_num: int) -> Torrent | None:
+        """Torrent of a row (the best release of a group), numbered from 1"""
+        if not 0 < torrent_num <= len(self.rows):
+            return None
+        row = self.rows[torrent_num - 1]
+        return row.best if isinstance(row, ResultGroup) else row
+
+    def local_file(self, torrent_num: int) -> LocalFile | None:
+        """Downloaded file of the torrent, if it's still there"""
+        torrent = self.torrent_at(torrent_num)
+        local = None if torrent is None else self.library.find(torrent)
+        if local is None or not os.path.isfile(local.path):
+            return None
+        return local
+
+    def library_root(self) -> str:
+        """Where webtorrent saves, its default is a webtorrent directory in the temp directory"""
+        return self.download_path or os.path.join(tempfile.gettempdir(), "webtorrent")
 
-    def play_torrent(self, torrent_num: int, player: str = "mpv") -> None:
-        if not self.results or not self.is_webtorrent_installed():
-            return
-        torrent_num -= 1
-        magnet_link = self.results[torrent_num]["magnet"]
-        path = f"-o {self.download_path}" if self.download_path else ""
-        os.system(f'webtorrent "{magnet_link}" --not-on-top --{player} {path}')
+    def speculate(self, torrent_num: int | None) -> None:
+        """Prebuffers the torrent if the selection stays on it, see Prebuffer. None cancels prebuffering"""
+        if self.config["prebuffer"]:
+            self.prebuffer.select(
+                None if torrent_num is None else self.torrent_at(torrent_num),
+                self.players.which("webtorrent"),
+                pinned=[session.torrent.id for session in self.playback.running()]
+            )
+
+    def prebuffer_root(self) -> Path:
+        return Path(self.download_path or tempfile.gettempdir()) / ".prebuffer"
 
     def get_download_path(self) -> str:
         return self.download_path
@@ -136,20 +470,61 @@ class AnimeStreamer:
         if not os.path.exists(path):
             return False
         self.download_path = path
-        with config.open(encoding="utf-8-sig") as f:
-            content = json.load(f)
-        content["download_path"] = self.download_path
-        with config.open("w") as f:
-            json.dump(content, f)
+        self.config.set("download_path", path)
+        self.prebuffer.root = self.prebuffer_root()
+        self.library.wake()
         return True
 
+    def set_show_at_once(self, show: int) -> None:
+        self.show_at_once = show
+        self.config.set("show_at_once", show)
+
+    def set_parsed(self, parsed: bool) -> None:
+        self.parsed = parsed
+        self.config.set("parsed", parsed)
+
+    def toggle_watched(self) -> bool:
+        """Follows the current query or stops following it, True if it's followed now.
+        group: and res: terms of the filter narrow it down, eg "group:subsplease res:1080p"."""
+        if not self.query.strip():
+            return False
+        if self.watchlist.find(self.query) is not None:
+            self.watchlist.remove(self.query)
+            return False
+        fields = dict(term.partition(":")[::2] for term in self.filter_query.lower().split() if ":" in term)
+        self.watchlist.add(self.query, fields.get("group", ""), fields.get("res", ""))
+        self.watcher.wake()
+        return True
+
+    def show_new_episodes(self) -> bool:
+        """Replaces the results with the new matches of the watchlist, False if there are none"""
+        results = self.watchlist.take_new()
+        if not results:
+            return False
+        self.engine.cancel()
+        self.query = ""
+        self.query_id += 1
+        self.clear_results()
+        self.add_page(results)
+        self.exhausted = True
+        return True
+
+    def dump_metrics(self) -> Path:
+        """Writes the recent timings to "metrics_path", returns where"""
+        path = Path(self.config["metrics_path"]) if self.config["metrics_path"] else CONFIG_DIR / "metrics.json"
+        metrics.dump(path)
+        return path
+
     def next_page(self) -> None:
+        """On the last page it moves on once more results are loaded (see wants_more)"""
         if self.curr_page < self.get_page_count():
             self.curr_page += 1
+        elif not self.exhausted:
+            self.advance_when_loaded = True
 
     def prev_page(self) -> None:
         if self.curr_page > 0:
             self.curr_page -= 1
 
     def get_page_count(self) -> int:
-        return len(self.results) // self.show_at_once
+        return len(self.rows) // self.show_at_once
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import Tuple
+
+from rich import box
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.segment import Segment
+from rich.text import Text
+
+Row = Tuple[str, str, str, str, str]  # num, title (markup), size, seeders, date
+
+
+class RowCache:
+    """Rendered table lines keyed by row content, selection and column widths"""
+
+    def __init__(self, maxsize: int = 2048) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lines: dict[tuple, list[Segment]] = {}
+        self._texts: dict[str, Text] = {}  # markup: parsed Text
+
+    def text(self, markup: str) -> Text:
+        text = self._texts.get(markup)
+        if text is None:
+            if len(self._texts) >= self.maxsize:
+                self._texts.clear()
+            text = self._texts[markup] = Text.from_markup(markup)
+        return text
+
+    def line(self, key: tuple, render) -> list[Segment]:
+        line = self._lines.get(key)
+        if line is None:
+            self.misses += 1
+            if len(self._lines) >= self.maxsize:
+                self._lines.clear()
+            line = self._lines[key] = render()
+        else:
+            self.hits += 1
+        return line
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultsTable:
+    """Table of the visible results drawn like rich's default Table, one line per row (long titles are cropped).
+    Rendered rows are cached, so moving the selection only renders the rows whose selection changed."""
+    headers = ("Num", "Name", "Size", "Seeders", "Date")
+    box = box.HEAVY_HEAD
+
+    def __init__(self, rows: list[Row], selected: int, cache: RowCache) -> None:
+        self.rows = rows
+        self.selected = selected  # 1-based row, like TorrentResults.selected_torrent
+        self.cache = cache
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        if not self.rows:
+            return
+        table_box = self.box.substitute(options)
+        widths = self.get_widths(options.max_width)
+        padded = [width + 2 for width in widths]
+        yield Segment(table_box.get_top(padded))
+        yield Segment.line()
+        yield from self.cache.line(
+            ("header", table_box, widths),
+            lambda: self.render_cells(console, table_box.head_left, table_box.head_vertical, table_box.head_right,
+                                      [Text(header, style="bold") for header in self.headers], widths)
+        )
+        yield Segment(table_box.get_row(padded, level="head"))
+        yield Segment.line()
+        for ix, row in enumerate(self.rows, start=1):
+            selected = ix == self.selected
+            yield from self.cache.line(
+                (row, selected, table_box, widths),
+                lambda: self.render_row(console, table_box, row, selected, widths)
+            )
+        yield Segment(table_box.get_bottom(padded))
+        yield Segment.line()
+
+    def get_widths(self, max_width: int) -> tuple[int, ...]:
+        widths = [len(header) for header in self.headers]
+        for row in self.rows:
+            for ix, cell in enumerate(row):
+                length = self.cache.text(cell).cell_len if ix == 1 else len(cell)
+                widths[ix] = max(widths[ix], length)
+        borders = 3 * len(widths) + 1
+        widths[1] = max(1, min(widths[1], max_width - borders - sum(widths) + widths[1]))
+        return tuple(widths)
+
+    def render_row(self, console: Console, table_box: box.Box, row: Row, selected: bool,
+                   widths: tuple[int, ...]) -> list[Segment]:
+        num, title, *rest = row
+        title = self.cache.text(title)
+        if selected:
+            title = title.copy()
+            title.stylize("bold red")
+        cells = [Text(num, style="red"), title, *(Text(cell) for cell in rest)]
+        return self.render_cells(console, table_box.mid_left, table_box.mid_vertical, table_box.mid_right,
+                                 cells, widths)
+
+    @staticmethod
+    def render_cells(console: Console, left: str, vertical: str, right: str,
+                     cells: list[Text], widths: tuple[int, ...]) -> list[Segment]:
+        line = [Segment(left)]
+        for ix, (cell, width) in enumerate(zip(cells, widths)):
+            cell = cell.copy()
+            cell.truncate(width, overflow="ellipsis", pad=True)
+            line.append(Segment(" "))
+            line.extend(Segment.apply_style(cell.render(console), console.get_style(cell.style)))
+            line.append(Segment(" " + (vertical if ix < len(widths) - 1 else right)))
+        line.append(Segment.line())
+        return line
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import re
+import time
+from dataclasses import dataclass
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+LINE_BREAK = re.compile(r"\r\n|\r|\n")  # webtorrent redraws its progress in place
+AMOUNT = r"([\d.]+)\s*([kMGTP]?B)"
+SPEED = re.compile(rf"Speed:\s*{AMOUNT}/s")
+DOWNLOADED = re.compile(rf"Downloaded:\s*{AMOUNT}\s*/\s*{AMOUNT}")
+UPLOADED = re.compile(rf"Uploaded:\s*{AMOUNT}")
+PEERS = re.compile(r"Peers:\s*(\d+)\s*/\s*(\d+)")
+SERVER_READY = "Server running at"  # webtorrent opens the player as soon as its server runs
+BYTE_UNITS = {  # prettier-bytes units used by webtorrent
+    "B": 1,
+    "kB": 1000,
+    "MB": 1000 ** 2,
+    "GB": 1000 ** 3,
+    "TB": 1000 ** 4,
+    "PB": 1000 ** 5
+}
+
+
+def parse_bytes(value: str, unit: str) -> int:
+    return int(float(value) * BYTE_UNITS.get(unit, 1))
+
+
+def format_bytes(amount: float) -> str:
+    for unit in ("B", "kB", "MB", "GB"):
+        if amount < 1000:
+            return f"{amount:.0f} {unit}" if unit == "B" else f"{amount:.1f} {unit}"
+        amount /= 1000
+    return f"{amount:.1f} TB"
+
+
+@dataclass
+class Telemetry:
+    download_speed: int = 0  # bytes/s
+    upload_speed: int = 0  # bytes/s, webtorrent only prints the total, so it's derived from it
+    downloaded: int = 0
+    uploaded: int = 0
+    length: int = 0
+    peers: int = 0  # unchoked
+    total_peers: int = 0
+    time_to_first_byte: float | None = None  # seconds from Enter until the first downloaded byte
+    startup_latency: float | None = None  # seconds from Enter until the player was launched
+
+    @property
+    def buffered(self) -> float:
+        """Downloaded part of the torrent in percent"""
+        return 100 * self.downloaded / self.length if self.length else 0.0
+
+
+class TelemetryParser:
+    """Streaming parser of the progress webtorrent prints, fed with chunks of its output as they come"""
+
+    def __init__(self, requested: float | None = None) -> None:
+        self.requested = time.monotonic() if requested is None else requested  # when Enter was pressed
+        self.telemetry = Telemetry()
+        self.version = 0  # incremented whenever telemetry changes
+        self._buffer = ""
+        self._last_upload: tuple[float, int] | None = None  # (time, uploaded)
+
+    def feed(self, chunk: str, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        lines = LINE_BREAK.split(self._buffer + chunk)
+        self._buffer = lines.pop()
+        for line in lines:
+            self.feed_line(line, now)
+
+    def feed_line(self, line: str, now: float) -> None:
+        line = ANSI_ESCAPE.sub("", line)
+        telemetry = self.telemetry
+        if SERVER_READY in line and telemetry.startup_latency is None:
+            telemetry.startup_latency = now - self.requested
+        match = SPEED.search(line)
+        if match:
+            telemetry.download_speed = parse_bytes(*match.groups())
+        match = DOWNLOADED.search(line)
+        if match:
+            telemetry.downloaded = parse_bytes(*match.groups()[:2])
+            telemetry.length = parse_bytes(*match.groups()[2:])
+            if telemetry.downloaded and telemetry.time_to_first_byte is None:
+                telemetry.time_to_first_byte = now - self.requested
+        match = UPLOADED.search(line)
+        if match:
+            telemetry.uploaded = parse_bytes(*match.groups())
+            self._update_upload_speed(now)
+        match = PEERS.search(line)
+        if match:
+            telemetry.peers, telemetry.total_peers = map(int, match.groups())
+        self.version += 1
+
+    def _update_upload_speed(self, now: float) -> None:
+        """Averaged over at least a second, webtorrent redraws more often than the total changes"""
+        if self._last_upload is None:
+            self._last_upload = (now, self.telemetry.uploaded)
+            return
+        last_time, last_uploaded = self._last_upload
+        if now - last_time >= 1:
+            self.telemetry.upload_speed = max(0, int((self.telemetry.uploaded - last_uploaded) / (now - last_time)))
+            self._last_upload = (now, self.telemetry.uploaded)
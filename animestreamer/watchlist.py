@@ -0,0 +1,175 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from animestreamer.backends import BackendError
+from animestreamer.filtering import field_matches
+
+KNOWN_IDS = 300  # torrent ids remembered per show, 4 pages
+MAX_NEW = 50  # new matches kept per show until they're looked at
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class WatchEntry:
+    """A followed show: a nyaa query, optionally only releases of a group and resolution"""
+    query: str
+    group: str = ""
+    resolution: str = ""  # eg 1080p
+    known: list[str] = field(default_factory=list)  # torrent ids seen on the first page, newest first
+    new: list[dict] = field(default_factory=list)  # matching results not looked at yet, newest first
+    checked: float = 0.0  # unix time of the last poll
+    error: str = ""  # of the last poll
+
+    def matches(self, parsed: dict) -> bool:
+        """parsed: anitopy result of the torrent name. group and resolution match like the filter's
+        "group:" and "res:" terms they're taken from, eg "erai" and "720" match "Erai-raws" and "720p"."""
+        if self.group and not field_matches("release_group", self.group, parsed.get("release_group", "")):
+            return False
+        if self.resolution and not field_matches("video_resolution", self.resolution,
+                                                 parsed.get("video_resolution", "")):
+            return False
+        return True
+
+    def label(self) -> str:
+        return " ".join(filter(None, (self.query, self.group and f"[{self.group}]", self.resolution)))
+
+
+class Watchlist:
+    """Followed shows saved in watchlist.json next to the config, polled by WatchlistPoller"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: list[WatchEntry] = []
+        self.version = 0  # incremented whenever an entry changes
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()  # the poller and the UI thread both save
+
+    def load(self) -> None:
+        try:
+            content = json.loads(self.path.read_text(encoding="utf-8"))
+            self.entries = [WatchEntry(**entry) for entry in content]
+        except (OSError, ValueError, TypeError):
+            self.entries = []
+
+    def save(self) -> None:
+        with self._save_lock:
+            with self._lock:
+                content = json.dumps([asdict(entry) for entry in self.entries], indent=4)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(content, encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def find(self, query: str) -> WatchEntry | None:
+        key = query.strip().lower()
+        return next((entry for entry in self.entries if entry.query.lower() == key), None)
+
+    def add(self, query: str, group: str = "", resolution: str = "") -> WatchEntry:
+        with self._lock:
+            entry = WatchEntry(query.strip(), group, resolution)
+            self.entries.append(entry)
+            self.version += 1
+        self.save()
+        return entry
+
+    def remove(self, query: str) -> None:
+        with self._lock:
+            self.entries = [entry for entry in self.entries if entry.query.lower() != query.strip().lower()]
+            self.version += 1
+        self.save()
+
+    def merge(self, entry: WatchEntry, results: list[dict], parse: Callable[[str], dict]) -> list[dict]:
+        """Takes in a fresh first page (newest first), returns the new matches.
+        Everything below the first known id was seen before. The first poll only remembers the ids."""
+        fresh = []
+        known = set(entry.known)
+        for result in results:
+            if result["id"] in known:
+                break
+            fresh.append(result)
+        matches = [result for result in fresh if entry.matches(parse(result["name"]) or {})] if entry.known else []
+        with self._lock:
+            entry.known = ([result["id"] for result in fresh] + entry.known)[:KNOWN_IDS]
+            entry.new = (matches + entry.new)[:MAX_NEW]
+            entry.checked = time.time()
+            entry.error = ""
+            self.version += 1
+        return matches
+
+    def new_count(self) -> int:
+        return sum(len(entry.new) for entry in self.entries)
+
+    def take_new(self) -> list[dict]:
+        """New matches of every show, they aren't new anymore afterwards"""
+        with self._lock:
+            results = [result for entry in self.entries for result in entry.new]
+            for entry in self.entries:
+                entry.new = []
+            self.version += 1
+        self.save()
+        return results
+
+
+class WatchlistPoller:
+    """Checks the first page of every followed show every `interval` seconds in a background thread.
+    fetch: (query) -> first page of results, newest first"""
+
+    def __init__(self, watchlist: Watchlist, fetch: Callable[[str], list], parse: Callable[[str], dict],
+                 interval: float) -> None:
+        self.watchlist = watchlist
+        self.fetch = fetch
+        self.parse = parse
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="watchlist", daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        """Polls the shows that are due now, eg one that was just added"""
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            for entry in list(self.watchlist.entries):
+                if self._stopped.is_set():
+                    return
+                if time.time() - entry.checked >= self.interval:
+                    try:
+                        self.poll(entry)
+                    except Exception as e:  # anything else would end the thread, and with it the polling
+                        log.exception("polling %r failed", entry.query)
+                        self.failed(entry, f"{type(e).__name__}: {e}")
+            due = min((entry.checked + self.interval for entry in self.watchlist.entries), default=None)
+            self._wake.wait(self.interval if due is None else max(1.0, due - time.time()))
+            self._wake.clear()
+
+    def poll(self, entry: WatchEntry) -> list[dict]:
+        """New matches of the show, nothing if nyaa couldn't be reached"""
+        try:
+            matches = self.watchlist.merge(entry, self.fetch(entry.query), self.parse)
+        except BackendError as e:
+            self.failed(entry, str(e))
+            return []
+        self.watchlist.save()
+        return matches
+
+    def failed(self, entry: WatchEntry, error: str) -> None:
+        entry.checked = time.time()  # tried again next interval
+        entry.error = error
+        self.watchlist.version += 1
@@ -1,19 +1,28 @@
 ﻿from ._custom_footer import CustomFooter
 from ._custom_header import CustomHeader
 from ._custom_widget import CustomWidget
+from ._filter_input import FilterInput
 from ._help import Help
+from ._metrics_overlay import MetricsOverlay
 from ._path_input import PathInput
+from ._playback_status import PlaybackStatus
 from ._sort import Sort
 from ._torrent_input import TorrentInput
-from ._torrent_results import TorrentResults
+from ._torrent_results import PageLoaded, TorrentResults
+from ._watchlist_status import WatchlistStatus
 
 __all__ = [  # when "from widgets import *" is used
     "CustomFooter",
     "CustomHeader",
     "CustomWidget",
+    "FilterInput",
     "Help",
+    "MetricsOverlay",
+    "PageLoaded",
     "PathInput",
+    "PlaybackStatus",
     "Sort",
     "TorrentInput",
-    "TorrentResults"
+    "TorrentResults",
+    "WatchlistStatus"
 ]
@@ -2,7 +2,7 @@
 from rich.table import Table
 from textual.widgets import Header
 
-from animestreamer import streamer
+import animestreamer
 
 
 class CustomHeader(Header):
@@ -13,7 +13,7 @@ class CustomHeader(Header):
     def render(self) -> Table:
         """Override for title"""
         title = "AnimeStreamer"
-        if not streamer.is_webtorrent_installed():
+        if not animestreamer.streamer.is_webtorrent_installed():
             title += " [red]<WebTorrent was not found>[/red]"
         header_table = Table.grid(padding=(0, 1), expand=True)
         header_table.add_column(justify="left", ratio=0, width=8)
@@ -0,0 +1,27 @@
+from rich.style import Style
+from textual.reactive import Reactive
+from textual_inputs import TextInput
+
+import animestreamer
+
+
+class FilterInput(TextInput):
+    """Filters the fetched results as you type"""
+    highlighted = Reactive(False)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.on_change_handler_name = "handle_filter_on_change"
+
+    def render(self):
+        self.border_style = Style(color="green") if self.highlighted else Style(color="blue")
+        return super(FilterInput, self).render()
+
+    def filter(self) -> None:
+        animestreamer.streamer.filter_results(self.value)
+
+    def on_enter(self) -> None:
+        self.highlighted = True
+
+    def on_leave(self) -> None:
+        self.highlighted = False
@@ -12,7 +12,14 @@ class Help(CustomWidget):
             "[b]Enter[/b] - confirm",
             "[b]Esc/Tab[/b] - remove focus",
             "[b]R[/b] - reverse sorting order",
+            "[b]Filter[/b] - eg SubsPlease 1080p E05",
             "[b]O[/b] - toggle title parsing",
+            "[b]G[/b] - group releases by episode",
+            "[b]E[/b] - expand/collapse episode",
+            "[b]S[/b] - stop playback",
+            "[b]W[/b] - follow/unfollow the search",
+            "[b]N[/b] - show new episodes of followed",
+            "[b]M[/b] - timings overlay, [b]D[/b] dumps them",
             "[b]Q[/b] - quit"
         )
         return Panel(
@@ -0,0 +1,43 @@
+﻿from __future__ import annotations
+
+from rich.markup import escape
+from rich.panel import Panel
+from rich.table import Table
+
+from animestreamer.metrics import metrics
+from animestreamer.widgets import CustomWidget
+
+
+class MetricsOverlay(CustomWidget):
+    """Recent latencies of the hot paths and cache hit rates, shown with M"""
+    refresh_rate = 1  # refreshes per second while shown
+    shown = False
+    dumped_to = ""  # where D dumped the metrics last
+
+    def on_mount(self) -> None:
+        self.set_interval(1 / self.refresh_rate, self.refresh_if_shown)
+
+    def refresh_if_shown(self) -> None:
+        if self.shown:
+            self.refresh()
+
+    def render(self) -> Panel:
+        table = Table(box=None, padding=(0, 1), expand=True)
+        table.add_column("ms")
+        table.add_column("p50", justify="right")
+        table.add_column("p95", justify="right")
+        table.add_column("n", justify="right", style="dim")
+        for name, stats in metrics.summary().items():
+            table.add_row(name, f"{stats['p50']:.2f}", f"{stats['p95']:.2f}", str(stats["count"]))
+        table.add_row()
+        for name, rate in metrics.rates().items():
+            table.add_row(f"{name} hits", f"{rate:.0%}", "", "")
+        if not metrics.enabled:
+            table.add_row("[red]disabled[/red]")
+        if self.dumped_to:
+            table.add_row(f"[green]dumped to[/green] {escape(self.dumped_to)}")
+        return Panel(
+            table,
+            title="Metrics [yellow][D dumps][/yellow]",
+            **self.get_style()
+        )
@@ -4,16 +4,17 @@ from rich.style import Style
 from textual.reactive import Reactive
 from textual_inputs import TextInput
 
-from animestreamer import streamer
+import animestreamer
 
 
 class PathInput(TextInput):
     highlighted = Reactive(False)
-    path = Reactive(streamer.get_download_path())
+    path = Reactive("")  # set once the streamer exists, not on import
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        if streamer.get_download_path() == "":
+        self.path = animestreamer.streamer.get_download_path()
+        if self.path == "":
             self.placeholder = "Default (depends on the OS)"
 
     def render(self):
@@ -23,15 +24,15 @@ class PathInput(TextInput):
     def set_path(self) -> bool:
         """Returns if path was set"""
         if os.path.exists(self.value):
-            streamer.set_download_path(self.value)
+            animestreamer.streamer.set_download_path(self.value)
             return True
         else:
             self.set_current_path()
             return False
 
     def set_current_path(self):
-        if self.value != streamer.get_download_path():
-            self.value = streamer.get_download_path()
+        if self.value != animestreamer.streamer.get_download_path():
+            self.value = animestreamer.streamer.get_download_path()
 
     def on_enter(self) -> None:
         self.highlighted = True
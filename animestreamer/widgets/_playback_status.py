@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from rich.markup import escape
+from rich.panel import Panel
+
+import animestreamer
+from animestreamer.telemetry import format_bytes
+from animestreamer.widgets import CustomWidget
+
+
+def seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value:.1f} s"
+
+
+class PlaybackStatus(CustomWidget):
+    refresh_rate = 2  # max refreshes per second, webtorrent redraws more often
+    rendered_version = -1
+
+    def on_mount(self) -> None:
+        self.set_interval(1 / self.refresh_rate, self.refresh_if_changed)
+
+    def refresh_if_changed(self) -> None:
+        if animestreamer.streamer.playback.version != self.rendered_version:
+            self.refresh()
+
+    def render(self) -> Panel:
+        streamer = animestreamer.streamer
+        self.rendered_version = streamer.playback.version
+        content = []
+        for session in streamer.playback.sessions:
+            telemetry = session.telemetry
+            content.append(
+                f"[b]{escape(session.torrent.name)}[/b]\n"
+                f"[green]↓[/green] {format_bytes(telemetry.download_speed)}/s  "
+                f"[blue]↑[/blue] {format_bytes(telemetry.upload_speed)}/s\n"
+                f"Peers {telemetry.peers}/{telemetry.total_peers}  Buffered {telemetry.buffered:.1f}%\n"
+                f"TTFB {seconds(telemetry.time_to_first_byte)}  Startup {seconds(telemetry.startup_latency)}"
+            )
+        if not content:
+            content.append("Nothing playing")
+        if streamer.playback.error:
+            content.append(f"[red]Couldn't play: {escape(streamer.playback.error)}[/red]")
+        latencies = list(streamer.playback.startup_latencies.values())[-5:]
+        if latencies:
+            content.append("[b]Startup latency[/b]\n" + "\n".join(
+                f"[yellow]{seconds(latency)}[/yellow] {escape(name)}" for name, latency in reversed(latencies)
+            ))
+        return Panel(
+            "\n\n".join(content),
+            title="Playback",
+            **self.get_style()
+        )
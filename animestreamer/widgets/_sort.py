@@ -1,15 +1,22 @@
 ﻿from rich.panel import Panel
 from textual.reactive import Reactive
 
-from animestreamer import streamer
+import animestreamer
 from animestreamer.widgets import CustomWidget
 
 
 class Sort(CustomWidget):
-    sorts = ("seeders", "date", "size", "completed_downloads", "leechers")
+    sorts = ("seeders", "health", "date", "size", "completed_downloads", "leechers")
     sort_ix = Reactive(0)
     reversed = Reactive(True)
 
+    def on_mount(self) -> None:
+        """Last used sorting"""
+        streamer = animestreamer.streamer
+        if streamer.sort_key in self.sorts:
+            self.sort_ix = self.sorts.index(streamer.sort_key)
+        self.reversed = streamer.sort_reverse
+
     def render(self) -> Panel:
         content = []
         for ix, sort in enumerate(self.sorts):
@@ -40,7 +47,7 @@ class Sort(CustomWidget):
         self.sort()
 
     def sort(self) -> None:
-        streamer.sort_results(key=self.get_current_sort(), reverse=self.reversed)
+        animestreamer.streamer.sort_results(key=self.get_current_sort(), reverse=self.reversed)
 
     def get_current_sort(self) -> str:
         return self.sorts[self.sort_ix]
\ No newline at end of file
@@ -1,8 +1,10 @@
-﻿from rich.style import Style
+﻿from typing import AsyncIterator
+
+from rich.style import Style
 from textual.reactive import Reactive
 from textual_inputs import TextInput
 
-from animestreamer import streamer
+import animestreamer
 
 
 class TorrentInput(TextInput):
@@ -13,11 +15,17 @@ class TorrentInput(TextInput):
         self.border_style = Style(color="green") if self.highlighted else Style(color="blue")
         return super(TorrentInput, self).render()
 
-    def search(self):
-        if self.last_search == self.value or not self.value:
+    def is_new_search(self) -> bool:
+        """Enter on the query already searched, or on an empty box, doesn't search again"""
+        return bool(self.value) and self.value != self.last_search
+
+    async def search(self) -> AsyncIterator[int]:
+        """Yields the number of loaded pages every time a page of results arrives"""
+        if not self.is_new_search():
             return
-        streamer.search(self.value)
         self.last_search = self.value
+        async for loaded_pages in animestreamer.streamer.search_async(self.value):
+            yield loaded_pages
 
     def set_current_search(self):
         if self.value != self.last_search:
@@ -1,46 +1,118 @@
 ﻿from rich.panel import Panel
+from textual.message import Message
 from textual.reactive import Reactive
 
-from animestreamer import streamer
+import animestreamer
+from animestreamer.metrics import metrics
 from animestreamer.widgets import CustomWidget
 
 
+class PageLoaded(Message):
+    """Posted to TorrentResults when a background search merged another page into the results"""
+
+
 class TorrentResults(CustomWidget):
     selected_torrent = Reactive(1)
     parsed = Reactive(True)
+    refresh_rate = 2  # max refreshes per second while titles for the filter and groups are parsed
+    library_version = -1  # of the local library when rendered, downloaded results are marked
+
+    def on_mount(self) -> None:
+        self.parsed = animestreamer.streamer.parsed
+        self.set_interval(1 / self.refresh_rate, self.refresh_if_outdated)
 
+    def refresh_if_outdated(self) -> None:
+        streamer = animestreamer.streamer
+        if streamer.are_rows_outdated():
+            streamer.resort()
+            self.refresh()
+        elif streamer.library.version != self.library_version:
+            self.refresh()
+
+    @metrics.timed("render")
     def render(self):
-        if streamer.results:
+        streamer = animestreamer.streamer
+        if streamer.rows:
             page = f"{streamer.curr_page + 1}/{streamer.get_page_count() + 1}"
         else:
             page = "No results"
         parse = " Torrent titles"
         parse = "Parsed" + parse if self.parsed else "Original" + parse
+        title = f"Torrents [yellow][{page}][/yellow] [yellow][{parse}][/yellow]"
+        if streamer.grouped:
+            title += f" [yellow]\\[{len(streamer.rows)} episode rows][/yellow]"
+        if streamer.filter_query.strip():
+            title += f" [yellow]\\[{len(streamer.results)} matching][/yellow]"
+        if streamer.failed_pages:
+            failed = len(streamer.failed_pages)
+            title += f" [red]\\[{failed} page{'s' if failed > 1 else ''} failed, retried when paging on][/red]"
+        if streamer.is_loading():
+            title += f" [yellow]\\[loading {streamer.loaded_pages}/{streamer.expected_pages}][/yellow]"  # escaped, not a tag
+        self.library_version = streamer.library.version
         return Panel(
             streamer.get_results_table(selected=self.selected_torrent, parsed=self.parsed),
-            title=f"Torrents [yellow][{page}][/yellow] [yellow][{parse}][/yellow]",
+            title=title,
             **self.get_style()
         )
 
-    def play_torrent(self):
-        torrent_num = self.selected_torrent + (streamer.curr_page * streamer.show_at_once)
-        streamer.play_torrent(torrent_num)
+    def handle_page_loaded(self, message: PageLoaded) -> None:
+        self.refresh()
+
+    def watch_selected_torrent(self, value: int) -> None:
+        self.speculate()
+
+    def watch_focused(self, value: bool) -> None:
+        self.speculate()
+
+    def speculate(self) -> None:
+        """Prebuffers the selected torrent while the results are focused, not on refreshes of a list nobody browses"""
+        animestreamer.streamer.speculate(self.selected_torrent_num() if self.focused else None)
+
+    def selected_torrent_num(self) -> int:
+        return self.selected_torrent + (animestreamer.streamer.curr_page * animestreamer.streamer.show_at_once)
+
+    async def play_torrent(self):
+        return await animestreamer.streamer.play_torrent(self.selected_torrent_num())
 
     def toggle_parse(self):
         self.parsed = not self.parsed
+        animestreamer.streamer.set_parsed(self.parsed)
+
+    def toggle_grouped(self):
+        animestreamer.streamer.toggle_grouped()
+        self.selected_torrent = 1
+        self.speculate()
+        self.refresh()
+
+    def toggle_group(self) -> bool:
+        """Expands or collapses the selected episode"""
+        streamer = animestreamer.streamer
+        torrent_num = self.selected_torrent + (streamer.curr_page * streamer.show_at_once)
+        if not streamer.toggle_group(torrent_num):
+            return False
+        self.speculate()
+        self.refresh()
+        return True
 
     def next_torrent(self):
-        if self.selected_torrent < streamer.show_at_once:
+        if self.selected_torrent < animestreamer.streamer.show_at_once:
             self.selected_torrent += 1
 
     def prev_torrent(self):
         if self.selected_torrent > 1:
             self.selected_torrent -= 1
 
+    def filter(self):
+        self.selected_torrent = 1
+        self.speculate()
+        self.refresh()
+
     def next_page(self):
-        streamer.next_page()
+        animestreamer.streamer.next_page()
+        self.speculate()
         self.refresh()
 
     def prev_page(self):
-        streamer.prev_page()
+        animestreamer.streamer.prev_page()
+        self.speculate()
         self.refresh()
\ No newline at end of file
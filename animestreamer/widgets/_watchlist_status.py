@@ -0,0 +1,53 @@
+﻿from __future__ import annotations
+import time
+
+from rich.markup import escape
+from rich.panel import Panel
+
+import animestreamer
+from animestreamer.widgets import CustomWidget
+
+SHOWN_MATCHES = 3  # newest matches listed per show
+
+
+def ago(timestamp: float) -> str:
+    if not timestamp:
+        return "not checked yet"
+    minutes = int(time.time() - timestamp) // 60
+    return f"{minutes // 60} h ago" if minutes >= 60 else f"{minutes} min ago"
+
+
+class WatchlistStatus(CustomWidget):
+    refresh_rate = 1 / 5  # refreshes per second, the watchlist is checked every few minutes
+    rendered_version = -1
+
+    def on_mount(self) -> None:
+        self.set_interval(1 / self.refresh_rate, self.refresh_if_changed)
+
+    def refresh_if_changed(self) -> None:
+        if animestreamer.streamer.watchlist.version != self.rendered_version:
+            self.refresh()
+
+    def render(self) -> Panel:
+        streamer = animestreamer.streamer
+        self.rendered_version = streamer.watchlist.version
+        content = []
+        for entry in streamer.watchlist.entries:
+            line = f"[b]{escape(entry.label())}[/b]"
+            if entry.new:
+                line += f" [green]{len(entry.new)} new[/green]"
+            line += f"\n[dim]{ago(entry.checked)}[/dim]"
+            if entry.error:
+                line += f" [red]{escape(entry.error)}[/red]"
+            for result in entry.new[:SHOWN_MATCHES]:
+                title = streamer.parse_torrent(result["name"]) if streamer.parsed else escape(result["name"])
+                line += f"\n[yellow]•[/yellow] {title}"
+            content.append(line)
+        if not content:
+            content.append("W follows the current search")
+        new = streamer.watchlist.new_count()
+        return Panel(
+            "\n".join(content),
+            title="Watchlist" + (f" [green][{new} new, N shows them][/green]" if new else ""),
+            **self.get_style()
+        )
@@ -0,0 +1,83 @@
+"""Local stand-ins for NyaaPy used by the benchmarks"""
+from __future__ import annotations
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from animestreamer.backends import NyaaPyBackend, SearchBackend
+from animestreamer.backends._rss import magnet
+from animestreamer.cache import SearchCache
+from animestreamer.fetching import ResilientFetch, TokenBucket
+from animestreamer.streamer import AnimeStreamer
+
+UNUSED_CACHE = Path(tempfile.gettempdir()) / "unused_search_cache.json"  # max_entries=0, never written
+
+GROUPS = ("SubsPlease", "Erai-raws", "EMBER", "Judas", "ASW", "Yameii")
+SHOWS = ("Spy x Family", "Chainsaw Man", "Bocchi the Rock!", "Mob Psycho 100 III", "Blue Lock", "Vinland Saga S2")
+RESOLUTIONS = ("480p", "720p", "1080p")
+UNITS = ("KiB", "MiB", "GiB")
+
+
+def make_row(ix: int, rng: random.Random) -> dict:
+    """A result row shaped like the dicts returned by NyaaPy.Nyaa.search"""
+    group = rng.choice(GROUPS)
+    show = rng.choice(SHOWS)
+    episode = rng.randint(1, 24)
+    resolution = rng.choice(RESOLUTIONS)
+    name = f"[{group}] {show} - {episode:02d} ({resolution}) [{rng.getrandbits(32):08X}].mkv"
+    return {
+        "id": str(1_000_000 + ix),
+        "category": "Anime - English-translated",
+        "url": f"http://nyaa.si/view/{1_000_000 + ix}",
+        "name": name,
+        "download_url": f"http://nyaa.si/download/{1_000_000 + ix}.torrent",
+        "magnet": magnet(f"{rng.getrandbits(160):040x}", name),
+        "size": f"{rng.uniform(1, 999):.1f} {rng.choice(UNITS)}",
+        "date": f"20{rng.randint(18, 22)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+        "seeders": str(rng.randint(0, 5000)),
+        "leechers": str(rng.randint(0, 500)),
+        "completed_downloads": str(rng.randint(0, 100_000)),
+    }
+
+
+def make_rows(count: int, start: int = 0, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [make_row(ix, rng) for ix in range(start, start + count)]
+
+
+class FakeNyaa:
+    """Mimics NyaaPy.Nyaa.search with injected latency, 75 results per page"""
+    latency = 0.2
+    jitter = 0.0  # latency varies by +- jitter * latency
+    per_page = 75
+    total: int | None = None  # results the query has, unlimited if None
+    requests = 0
+
+    @staticmethod
+    def search(keyword: str, **kwargs) -> list[dict]:
+        page = max(kwargs.get("page", 0), 1)  # nyaa serves page 1 for page 0
+        FakeNyaa.requests += 1
+        time.sleep(FakeNyaa.latency * (1 + random.uniform(-FakeNyaa.jitter, FakeNyaa.jitter)))
+        start = (page - 1) * FakeNyaa.per_page
+        count = FakeNyaa.per_page
+        if FakeNyaa.total is not None:
+            count = max(0, min(count, FakeNyaa.total - start))
+        return make_rows(count, start=start, seed=page)
+
+
+def offline(streamer: AnimeStreamer, backend: SearchBackend | None = None) -> AnimeStreamer:
+    """Sets up a streamer to search FakeNyaa (or `backend`) with nothing read from or written to the user's files:
+    settings stay in memory and the search cache is off. Fetches aren't rate limited, the limit would throttle the
+    repeated searches and the timings would measure it instead of the search"""
+    streamer.config.readonly = True
+    streamer.backend = NyaaPyBackend(FakeNyaa) if backend is None else backend
+    streamer.fetcher = ResilientFetch(TokenBucket(0, 1))
+    streamer.cache = SearchCache(UNUSED_CACHE, max_entries=0)
+    return streamer
+
+
+def offline_streamer(backend: SearchBackend | None = None) -> AnimeStreamer:
+    """The app's streamer, see offline()"""
+    from animestreamer import streamer  # created on first use
+    return offline(streamer, backend)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Stand-in for webtorrent used by benchmarks/prebuffer.py, records its launches and cancellations.
+
+Takes the arguments animestreamer passes (magnet, -o directory, --<player>). Fetching metadata takes
+FAKE_WEBTORRENT_METADATA seconds unless the directory has it from an earlier run, then the "video" grows
+by FAKE_WEBTORRENT_RATE MB/s, starting from what's already in the directory. With a player flag it prints
+"Server running at" once FAKE_WEBTORRENT_STARTUP MB are there, which is when webtorrent opens the player.
+Every launch and SIGTERM is appended as a JSON line to FAKE_WEBTORRENT_LOG.
+"""
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+METADATA = float(os.environ.get("FAKE_WEBTORRENT_METADATA", "1.0"))
+RATE = float(os.environ.get("FAKE_WEBTORRENT_RATE", "16")) * 1000 ** 2
+STARTUP = float(os.environ.get("FAKE_WEBTORRENT_STARTUP", "8")) * 1000 ** 2
+LENGTH = 1000 * 1000 ** 2
+TICK = 0.05
+
+
+def log(event: str, **fields) -> None:
+    path = os.environ.get("FAKE_WEBTORRENT_LOG")
+    if path:
+        with open(path, "a") as file:
+            file.write(json.dumps({"event": event, "pid": os.getpid(), "time": time.time(), **fields}) + "\n")
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    magnet = next((arg for arg in args if arg.startswith("magnet:")), "")
+    directory = Path(args[args.index("-o") + 1]) if "-o" in args else Path("/tmp/webtorrent")
+    player = next((arg[2:] for arg in args if arg.startswith("--") and arg != "--not-on-top"), None)
+    video = directory / "video.mkv"
+    log("launch", magnet=magnet, directory=str(directory), player=player)
+    have = 0
+
+    def terminated(*_) -> None:
+        log("terminated", player=player, downloaded=have)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, terminated)
+    directory.mkdir(parents=True, exist_ok=True)
+    metadata = directory / ".metadata"
+    if not metadata.exists():
+        time.sleep(METADATA)
+        metadata.touch()
+    have = video.stat().st_size if video.exists() else 0
+    server_running = False
+    while have < LENGTH:
+        if player and have >= STARTUP and not server_running:
+            print("Server running at: http://localhost:8000/webtorrent/0", flush=True)
+            server_running = True
+        print(f"Speed: {RATE / 1000 ** 2:.1f} MB/s Downloaded: {have / 1000 ** 2:.1f} MB / {LENGTH / 1000 ** 2:.1f} MB",
+              flush=True)
+        time.sleep(TICK)
+        have = min(LENGTH, have + int(RATE * TICK))
+        with video.open("ab") as file:
+            file.truncate(have)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Throughput of headless batch searches (animestreamer search) in queries/s against a local MockNyaaServer,
+by the number of workers. Also the time until the first result line is written, which doesn't wait for the batch.
+
+Run: python benchmarks/batch.py
+"""
+from __future__ import annotations
+import io
+import sys
+import time
+
+from _fake_nyaa import offline
+
+from animestreamer.backends import MockNyaaServer, RssBackend
+from animestreamer.cli import BatchSearch, create_streamers
+
+QUERIES = 32
+PAGES = 3  # batches of 1 and 2
+LATENCY = 0.3  # seconds per mock response, about what nyaa takes
+WORKERS = (1, 2, 4, 8)
+
+
+class FirstLine(io.StringIO):
+    """Output sink remembering when the first line came in"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.first: float | None = None
+
+    def write(self, text: str) -> int:
+        if self.first is None:
+            self.first = time.perf_counter()
+        return super().write(text)
+
+
+def run(url: str, workers: int) -> tuple[float, float, int]:
+    """(queries/s, seconds until the first result, result lines)"""
+    streamers = create_streamers(workers)
+    backend = RssBackend(url)
+    for streamer in streamers:
+        offline(streamer, backend)
+        streamer.pages = PAGES
+    out = FirstLine()
+    batch = BatchSearch(streamers, out)
+    start = time.perf_counter()
+    batch.run(f"batch {workers} {ix}" for ix in range(QUERIES))
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return QUERIES / elapsed, out.first - start, batch.written
+
+
+def main() -> None:
+    with MockNyaaServer(latency=LATENCY) as server:
+        run(server.url, 1)  # warm up anitopy and the connections
+        print(f"{QUERIES} queries, {PAGES} pages each, {LATENCY * 1000:.0f} ms per page")
+        for workers in WORKERS:
+            rate, first, lines = run(server.url, workers)
+            print(f"{workers} worker{'s' if workers > 1 else ' '}  {rate:6.1f} queries/s  "
+                  f"first result after {first * 1000:5.0f} ms  {lines} lines")
+    print(f"Textual imported: {'textual' in sys.modules}")
+
+
+if __name__ == "__main__":
+    main()
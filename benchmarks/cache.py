@@ -0,0 +1,40 @@
+"""Latency of a repeated query with the search cache, every page taking `FakeNyaa.latency` seconds.
+
+Run: python benchmarks/cache.py
+"""
+from __future__ import annotations
+import tempfile
+import time
+from pathlib import Path
+
+from _fake_nyaa import FakeNyaa, offline_streamer
+
+from animestreamer.cache import SearchCache
+
+streamer = offline_streamer()
+
+
+def measure(text: str) -> float:
+    start = time.perf_counter()
+    streamer.search(text)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "search_cache.json"
+        streamer.cache = SearchCache(path)
+        cold = measure("spy x family")
+        warm = measure("spy x family")
+        # a fresh instance has to read the cache file first, like after restarting the app
+        streamer.cache = SearchCache(path)
+        restarted = measure("Spy x Family")
+        print(f"{streamer.pages} pages, {FakeNyaa.latency * 1000:.0f} ms per page")
+        print(f"first search:         {cold * 1000:8.2f} ms")
+        print(f"repeated search:      {warm * 1000:8.2f} ms")
+        print(f"after restart:        {restarted * 1000:8.2f} ms")
+        print(f"hits: {streamer.cache.hits}, misses: {streamer.cache.misses}, cache file: {path.stat().st_size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
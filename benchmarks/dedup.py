@@ -0,0 +1,62 @@
+"""Deduplication of merged pages: list.remove() rescans vs the id lookups of ResultIndex.unseen().
+Building the Torrent records of the unique rows is timed on its own, ResultIndex.add() does both.
+
+Run: python benchmarks/dedup.py
+"""
+from __future__ import annotations
+import time
+
+from _fake_nyaa import make_rows
+
+from animestreamer.results import ResultIndex, Torrent
+
+DUPLICATE_RATIO = 1 / 6  # NyaaPy page 0 is the same as page 1
+
+
+def with_duplicates(count: int) -> list[dict]:
+    unique = make_rows(int(count * (1 - DUPLICATE_RATIO)))
+    return unique + [dict(r) for r in unique[:count - len(unique)]]
+
+
+def list_remove(results: list[dict]) -> list[dict]:
+    """How AnimeStreamer.search used to remove duplicates"""
+    results = list(results)
+    ids = set()
+    to_remove = []
+    for r in results:
+        if r["id"] in ids:
+            to_remove.append(r)
+        ids.add(r["id"])
+    for r in to_remove:
+        results.remove(r)
+    return results
+
+
+def result_index(results: list[dict]) -> list[dict]:
+    return ResultIndex().unseen(results)
+
+
+def records(results: list[dict]) -> list[Torrent]:
+    return [Torrent.from_nyaa(result) for result in results]
+
+
+def measure(dedup, results: list[dict]) -> tuple[float, int]:
+    start = time.perf_counter()
+    deduped = dedup(results)
+    return time.perf_counter() - start, len(deduped)
+
+
+def main() -> None:
+    print(f"{'rows':>8} {'unique':>8} {'list.remove':>14} {'ResultIndex':>14} {'records':>14} {'add()':>14}")
+    for count in (10_000, 20_000, 50_000, 100_000):
+        results = with_duplicates(count)
+        index_time, unique = measure(result_index, results)
+        remove_time, remove_unique = measure(list_remove, results)
+        assert remove_unique == unique
+        records_time, _ = measure(records, result_index(results))
+        add_time, _ = measure(ResultIndex().add, results)
+        print(f"{count:>8} {unique:>8} {remove_time * 1000:11.1f} ms {index_time * 1000:11.2f} ms "
+              f"{records_time * 1000:11.1f} ms {add_time * 1000:11.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Filter-as-you-type latency over the inverted index, typed one key at a time.
+
+anitopy takes about 0.7 ms per title, so the parses of the fake names are read from their known format
+instead of parsing 50k titles before the benchmark starts.
+
+Run: python benchmarks/filtering.py
+"""
+from __future__ import annotations
+import re
+import statistics
+import time
+
+from _fake_nyaa import make_rows
+
+from animestreamer.filtering import FilterIndex
+from animestreamer.results import ResultIndex
+
+ROWS = 50_000
+REPEAT = 5  # best of, per key
+QUERIES = ("SubsPlease 1080p E05", "group:Erai res:720 ep:12", "chainsaw man s2", "bocchi")
+FAKE_NAME = re.compile(r"\[(?P<group>.+?)\] (?P<title>.+) - (?P<episode>\d+) \((?P<resolution>\d+p)\)")
+
+
+def fake_parse(name: str) -> dict:
+    """What anitopy gives for the names made by make_row"""
+    match = FAKE_NAME.match(name)
+    return {
+        "release_group": match.group("group"),
+        "anime_title": match.group("title"),
+        "episode_number": match.group("episode"),
+        "video_resolution": match.group("resolution")
+    }
+
+
+def main() -> None:
+    index = ResultIndex()
+    torrents = index.add(make_rows(ROWS))
+    filters = FilterIndex()
+    start = time.perf_counter()
+    filters.add_names(0, (t.name for t in torrents))
+    filters.add_fields(filters.generation, 0, (fake_parse(t.name) for t in torrents))
+    print(f"{ROWS} results, indexed in {(time.perf_counter() - start) * 1000:.0f} ms")
+    index.sorted("seeders", reverse=True)  # the sort is cached before filtering, as in the app
+
+    for query in QUERIES:
+        typed = [query[:end] for end in range(1, len(query) + 1)]
+        latencies = []
+        for text in typed:
+            runs = []
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                results = index.sorted("seeders", reverse=True, subset=filters.match(text))
+                results[:10]  # first page
+                runs.append((time.perf_counter() - start) * 1000)
+            latencies.append(min(runs))
+        full = latencies[-1]
+        print(f"{query!r:28} {len(results):6} matching, full query {full:7.3f} ms, "
+              f"per key median {statistics.median(latencies):7.3f} ms, max {max(latencies):7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
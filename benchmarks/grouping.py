@@ -0,0 +1,75 @@
+"""Rebuilding the episode rows of a grouped, deep search on every resort: regrouping every result
+vs EpisodeGroups, which re-sorts only the groups that got new members.
+
+Run: python benchmarks/grouping.py
+"""
+from __future__ import annotations
+import time
+from typing import Callable
+
+from _fake_nyaa import make_rows
+
+from animestreamer.grouping import EpisodeGroups, GroupKey, ResultGroup, episode_key
+from animestreamer.parsing import TitleParser
+from animestreamer.ranking import health_scores
+from animestreamer.results import ResultIndex
+
+ROWS = 20_000
+PAGE = 75
+
+
+def regroup(index: ResultIndex, keys: dict[str, GroupKey | None], key: str, reverse: bool) -> list[ResultGroup]:
+    """How EpisodeGroups.group used to build the rows, grouping every result and walking the health order"""
+    groups: dict[GroupKey, ResultGroup] = {}
+    for torrent in index.sorted(key, reverse):
+        group_key = keys.get(torrent.id) or ("", "", torrent.id)
+        group = groups.get(group_key)
+        if group is None:
+            group = groups[group_key] = ResultGroup(group_key)
+        group.releases.append(torrent)
+    for torrent in index.sorted("health", True):
+        group = groups[keys.get(torrent.id) or ("", "", torrent.id)]
+        if group.best is None:
+            group.best = torrent
+    return list(groups.values())
+
+
+def timed(run: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    run()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = TitleParser(maxsize=ROWS + PAGE)
+    index = ResultIndex(scorers={"health": health_scores})
+    groups = EpisodeGroups()
+    keys: dict[str, GroupKey | None] = {}  # what regroup() looks the episodes up in
+
+    def add(rows: list[dict]) -> None:
+        added = index.add(rows)
+        first = len(index) - len(added)
+        parsed = [parser.parse(torrent.name) for torrent in added]
+        groups.expect(first, len(added))
+        groups.add(groups.generation, first, parsed)
+        keys.update((torrent.id, episode_key(fields)) for torrent, fields in zip(added, parsed))
+
+    add(make_rows(ROWS))
+    cases = (  # name, sort key, reverse, done before
+        ("first grouping", "seeders", True, None),
+        ("resort", "seeders", True, None),
+        ("reversed", "seeders", False, None),
+        ("another sort key", "date", True, None),
+        ("another page merged", "date", True, lambda: add(make_rows(PAGE, start=ROWS, seed=1)))
+    )
+    print(f"{'':20} {'regrouping':>12} {'EpisodeGroups':>14}")
+    for name, key, reverse, setup in cases:
+        if setup is not None:
+            setup()
+        before = timed(lambda: regroup(index, keys, key, reverse))
+        after = timed(lambda: groups.group(index, key, reverse))
+        print(f"{name:20} {before:9.2f} ms {after:11.2f} ms")
+    print(f"{len(index)} results, {len(groups.group(index, 'date', True))} episode rows")
+
+if __name__ == "__main__":
+    main()
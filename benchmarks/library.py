@@ -0,0 +1,61 @@
+"""Scanning a download path into the local library: first scan, rescan with nothing changed,
+rescan after one new file and after a file grew, and matching search results against it.
+
+Run: python benchmarks/library.py
+"""
+from __future__ import annotations
+import tempfile
+import time
+from pathlib import Path
+
+from _fake_nyaa import make_rows
+
+from animestreamer.library import LocalLibrary
+from animestreamer.parsing import TitleParser
+from animestreamer.results import Torrent
+
+SHOWS = 100  # one directory per show like batch downloads
+FILES = 20  # per show
+
+
+def create(root: Path, rows: list[dict]) -> None:
+    """Sparse files with the names and sizes of the results"""
+    for ix, row in enumerate(rows):
+        directory = root / f"show {ix % SHOWS}"
+        directory.mkdir(exist_ok=True)
+        with (directory / row["name"]).open("wb") as file:
+            file.truncate(Torrent.from_nyaa(row).size_bytes)
+
+
+def timed(label: str, run) -> None:
+    start = time.perf_counter()
+    result = run()
+    print(f"{label:34} {(time.perf_counter() - start) * 1000:8.1f} ms  {result}")
+
+
+def main() -> None:
+    rows = make_rows(SHOWS * FILES)
+    torrents = [Torrent.from_nyaa(row) for row in make_rows(SHOWS * FILES * 2)]  # half of them downloaded
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "downloads"
+        root.mkdir()
+        create(root, rows)
+        library = LocalLibrary(Path(tmp) / "library.json", TitleParser().parse)
+        print(f"{len(rows)} files in {SHOWS} directories")
+        timed("first scan", lambda: f"{library.scan(str(root))} files indexed")
+        timed("save", library.save)
+        library = LocalLibrary(library.path, TitleParser().parse)
+        timed("load after restart", library.load)
+        timed("rescan, nothing changed", lambda: f"{library.scan(str(root))} files changed")
+        create(root, make_rows(1, start=SHOWS * FILES * 3, seed=7))
+        timed("rescan after a new download", lambda: f"{library.scan(str(root))} files changed")
+        with (root / "show 0" / rows[0]["name"]).open("ab") as file:
+            file.write(b"\0" * 4096)  # still downloading, the directory's mtime stays
+        timed("rescan after a download grew", lambda: f"{library.scan(str(root))} files changed")
+        found = lambda: f"{sum(library.find(torrent) is not None for torrent in torrents)} of {len(torrents)} local"
+        timed("marking results, titles unparsed", found)
+        timed("marking results, titles parsed", found)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Bytes per result held by the ResultIndex (with every sort key's column and order built), next to the raw
+NyaaPy dicts it's built from, for 100k synthetic rows decoded from JSON so no string is shared between rows.
+Also the time it takes to add them and sort by every key.
+
+Run: python benchmarks/memory.py
+"""
+from __future__ import annotations
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+from _fake_nyaa import make_rows
+from sort import SORTS as ATTRIBUTE_SORTS
+
+from animestreamer.ranking import health_scores
+from animestreamer.results import ResultIndex
+
+ROWS = 100_000
+SORTS = (*ATTRIBUTE_SORTS, "health")
+
+
+def retained(build: Callable[[], object]) -> tuple[int, object]:
+    """(bytes still allocated once build() returned and its garbage is collected, what it returned)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def build_index(encoded: str) -> ResultIndex:
+    index = ResultIndex(scorers={"health": health_scores})
+    index.add(json.loads(encoded))  # the raw rows are dropped afterwards, like pages evicted from the cache
+    for key in SORTS:
+        index.sorted(key)
+    return index
+
+
+def main() -> None:
+    encoded = json.dumps(make_rows(ROWS))
+    raw, rows = retained(lambda: json.loads(encoded))
+    del rows
+    start = time.perf_counter()
+    stored, index = retained(lambda: build_index(encoded))
+    elapsed = time.perf_counter() - start  # traced, slower than without tracemalloc
+    del index
+    start = time.perf_counter()
+    build_index(encoded)
+    print(f"{ROWS} results")
+    print(f"raw NyaaPy dicts     {raw / ROWS:6.0f} bytes/result")
+    print(f"ResultIndex, sorted  {stored / ROWS:6.0f} bytes/result  "
+          f"added and sorted by {len(SORTS)} keys in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({elapsed * 1000:.0f} ms traced)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Overhead of the metrics decorator and timer per call, disabled and enabled.
+
+Run: python benchmarks/metrics.py
+"""
+from __future__ import annotations
+import timeit
+
+from animestreamer.metrics import Metrics
+
+CALLS = 1_000_000
+
+
+def main() -> None:
+    metrics = Metrics()
+
+    def plain() -> None:
+        pass
+
+    timed = metrics.timed("call")(plain)
+
+    def with_timer() -> None:
+        with metrics.timer("call"):
+            pass
+
+    baseline = min(timeit.repeat(plain, number=CALLS, repeat=3))
+    print(f"{CALLS} calls, overhead over a plain call in ns per call")
+    for enabled in (False, True):
+        metrics.enabled = enabled
+        state = "enabled " if enabled else "disabled"
+        for name, func in (("decorator", timed), ("timer", with_timer)):
+            seconds = min(timeit.repeat(func, number=CALLS, repeat=3))
+            print(f"{state} {name:10} {(seconds - baseline) / CALLS * 1e9:7.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
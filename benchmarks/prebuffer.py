@@ -0,0 +1,84 @@
+"""Startup latency of playing a torrent cold and after the selection rested on it (speculative prebuffering),
+with a fake webtorrent that takes FAKE_WEBTORRENT_METADATA seconds for metadata and downloads 16 MB/s.
+Also checks that moving the selection cancels sessions and that the scratch area stays under its quota.
+
+Run: python benchmarks/prebuffer.py
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from _fake_nyaa import make_rows
+
+from animestreamer.playback import PlaybackManager
+from animestreamer.prebuffer import MIB, Prebuffer, disk_usage
+from animestreamer.results import Torrent
+
+WEBTORRENT = str(Path(__file__).with_name("_fake_webtorrent.py"))
+DWELL = 0.5
+BUDGET = 16 * MIB
+
+
+async def startup_latency(playback: PlaybackManager, torrent: Torrent, download_path: str) -> float:
+    """Seconds until the fake webtorrent would open the player"""
+    session = await playback.play(WEBTORRENT, torrent, "mpv", download_path)
+    while session.telemetry.startup_latency is None:
+        await asyncio.sleep(0.01)
+    await session.stop()
+    return session.telemetry.startup_latency
+
+
+def launches(log: Path) -> tuple[int, int]:
+    """(speculative launches, speculative sessions terminated before their budget was in) from the fake's log"""
+    events = [json.loads(line) for line in log.read_text().splitlines()] if log.exists() else []
+    started = sum(1 for event in events if event["event"] == "launch" and event["player"] is None)
+    terminated = sum(1 for event in events if event["event"] == "terminated" and event["player"] is None
+                     and event["downloaded"] < BUDGET)
+    return started, terminated
+
+
+async def main() -> None:
+    torrents = [Torrent.from_nyaa(row) for row in make_rows(8)]
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "webtorrent.log"
+        os.environ["FAKE_WEBTORRENT_LOG"] = str(log)
+        playback = PlaybackManager()
+        prebuffer = Prebuffer(Path(tmp) / ".prebuffer", dwell=DWELL, budget=BUDGET, quota=3 * BUDGET)
+
+        cold = await startup_latency(playback, torrents[0], str(Path(tmp) / "cold"))
+        print(f"cold start:                          {cold:5.2f} s")
+
+        for torrent in torrents[1:4]:  # scrolling past, shorter than the dwell time
+            prebuffer.select(torrent, WEBTORRENT)
+            await asyncio.sleep(DWELL / 2)
+        prebuffer.select(torrents[4], WEBTORRENT)
+        await asyncio.sleep(DWELL + 1.5)  # metadata and part of the budget
+        started, stopped = launches(log)
+        print(f"scrolled past 3, rested on 1:        {started} launched, {stopped} stopped early")
+        downloads = str(Path(tmp) / "downloads")
+        await prebuffer.take(torrents[4], downloads)  # moved out of the scratch area, kept after playing
+        warm = await startup_latency(playback, torrents[4], downloads)
+        print(f"Enter after resting {DWELL + 1.5:.1f} s:            {warm:5.2f} s")
+
+        prebuffer.select(torrents[5], WEBTORRENT)
+        await asyncio.sleep(DWELL + 0.2)
+        prebuffer.select(torrents[6], WEBTORRENT)  # moves on while fetching
+        await asyncio.sleep(0.3)
+        started, stopped = launches(log)
+        print(f"moved on while prebuffering:         {started} launched, {stopped} stopped early "
+              f"(1 handed to the player, {prebuffer.cancelled} cancelled)")
+
+        for torrent in torrents:  # rest on every torrent until its budget is in
+            prebuffer.select(torrent, WEBTORRENT)
+            await asyncio.sleep(DWELL + 2.5)
+        used = disk_usage(prebuffer.root)
+        print(f"after prebuffering {len(torrents)} torrents:      {used / MIB:5.1f} MiB on disk, "
+              f"quota {prebuffer.quota / MIB:.0f} MiB + one session")
+        await prebuffer.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""Scoring and sorting by swarm health on growing result sets.
+
+Run: python benchmarks/ranking.py
+"""
+from __future__ import annotations
+import time
+
+from _fake_nyaa import make_rows
+
+from animestreamer.ranking import health_scores
+from animestreamer.results import ResultIndex
+
+SIZES = (10_000, 50_000, 100_000)
+PAGE = 75
+
+
+def main() -> None:
+    for rows_count in SIZES:
+        rows = make_rows(rows_count)
+        index = ResultIndex(scorers={"health": health_scores})
+        index.add(rows)
+        torrents = list(index)
+
+        start = time.perf_counter()
+        health_scores(torrents)
+        score = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        index.sorted("health", reverse=True)[:10]
+        cold = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        index.sorted("health", reverse=True)[:10]
+        warm = (time.perf_counter() - start) * 1000
+
+        index.add(make_rows(PAGE, start=rows_count))
+        start = time.perf_counter()
+        index.sorted("health", reverse=True)[:10]
+        page = (time.perf_counter() - start) * 1000
+
+        print(f"{rows_count:>7} results: scores {score:8.2f} ms, cold sort {cold:8.2f} ms, "
+              f"warm {warm:6.3f} ms, after another page {page:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
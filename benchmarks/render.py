@@ -0,0 +1,82 @@
+"""Frame times of TorrentResults while moving through the results with next_torrent/next_page.
+
+Run: python benchmarks/render.py
+"""
+from __future__ import annotations
+import io
+import time
+
+import anitopy
+from _fake_nyaa import make_rows, offline_streamer
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+from animestreamer.widgets import TorrentResults
+
+streamer = offline_streamer()
+
+
+def rich_table(selected: int, parsed: bool) -> Table:
+    """How AnimeStreamer.get_results_table used to build a new rich Table every frame"""
+    table = Table()
+    table.add_column("Num", style="red")
+    table.add_column("Name")
+    table.add_column("Size")
+    table.add_column("Seeders")
+    table.add_column("Date")
+    for i, res in enumerate(streamer.top_results()):
+        num = i + 1 + (streamer.curr_page * streamer.show_at_once)
+        title = streamer.parse_torrent(res.name) if parsed else res.name
+        if i + 1 == selected:
+            title = streamer.colored(title, "bold red")
+        table.add_row(str(num), title, res.size, str(res.seeders), res.date)
+    return table
+
+
+def frames(widget: TorrentResults, render, pages: int) -> list[float]:
+    """Milliseconds per frame, moving the selection over every torrent of the first pages"""
+    console = Console(file=io.StringIO(), width=160)
+    streamer.curr_page = 0
+    times = []
+    for _ in range(pages):
+        widget.selected_torrent = 1
+        for _ in range(streamer.show_at_once):
+            start = time.perf_counter()
+            console.print(render())
+            times.append((time.perf_counter() - start) * 1000)
+            widget.next_torrent()
+        widget.next_page()
+    return times
+
+
+def report(label: str, times: list[float]) -> None:
+    times = sorted(times)
+    print(f"{label:<32} mean {sum(times) / len(times):6.2f} ms   p95 {times[int(len(times) * 0.95)]:6.2f} ms")
+
+
+def main() -> None:
+    rows, pages = 5000, 50
+    streamer.clear_results()
+    streamer.add_page(make_rows(rows))
+    streamer.parser.preparse([]).result()  # wait for background parsing
+    widget = TorrentResults()
+    old = lambda: Panel(rich_table(widget.selected_torrent, widget.parsed))
+    print(f"{rows} results, {streamer.show_at_once} per page, {pages} pages")
+
+    widget.parsed = False
+    report("original titles, rich Table", frames(widget, old, pages))
+    report("original titles, cached rows", frames(widget, widget.render, pages))
+    widget.parsed = True
+    memoized = streamer.parser.parse
+    streamer.parser.parse = anitopy.parse
+    report("parsed on every render", frames(widget, old, pages))
+    streamer.parser.parse = memoized
+    report("memoized parsing, rich Table", frames(widget, old, pages))
+    streamer.row_cache = type(streamer.row_cache)()
+    report("memoized parsing, cached rows", frames(widget, widget.render, pages))
+    print(f"parse cache hit rate: {streamer.parser.hit_rate():.0%}, row cache hit rate: {streamer.row_cache.hit_rate():.0%}")
+
+
+if __name__ == "__main__":
+    main()
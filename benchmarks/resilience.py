@@ -0,0 +1,53 @@
+"""Searches against a MockNyaaServer injecting errors and slow responses, with and without retries,
+deadlines and the rate limit. Shows how many pages arrive and how long the search takes.
+
+Run: python benchmarks/resilience.py
+"""
+from __future__ import annotations
+import time
+
+from _fake_nyaa import offline_streamer
+
+from animestreamer.backends import MockNyaaServer, RssBackend
+from animestreamer.fetching import ResilientFetch, TokenBucket
+
+PAGES = 7  # batches of 1, 2 and 4
+RUNS = 5
+SCENARIOS = (  # name, mock server, fetch settings
+    ("30% errors, no retries", dict(latency=0.05, error_rate=0.3), dict(retries=0)),
+    ("30% errors, retries", dict(latency=0.05, error_rate=0.3), dict(retries=3)),
+    ("slow tail, no deadline", dict(latency=0.3, jitter=1.0), dict(deadline=60)),
+    ("slow tail, 0.4 s deadline", dict(latency=0.3, jitter=1.0), dict(deadline=0.4)),
+    ("no rate limit", dict(latency=0.02), dict(rate=0)),
+    ("2 requests/s, burst 2", dict(latency=0.02), dict(rate=2, burst=2)),
+)
+
+streamer = offline_streamer()
+
+
+def configure(url: str, retries: int = 3, deadline: float = 20, rate: float = 0, burst: int = 6) -> None:
+    streamer.backend = RssBackend(url, timeout=deadline)
+    streamer.fetcher = ResilientFetch(TokenBucket(rate, burst), retries=retries, backoff=0.05, deadline=deadline)
+    streamer.engine.timeout = deadline
+
+
+def main() -> None:
+    streamer.pages = PAGES
+    print(f"{PAGES} pages per search, {RUNS} searches each, mean of the runs")
+    print(f"{'':28} {'seconds':>8} {'max s':>7} {'pages':>6} {'requests':>9}")
+    for name, server_settings, fetch_settings in SCENARIOS:
+        with MockNyaaServer(**server_settings) as server:
+            configure(server.url, **fetch_settings)
+            seconds, pages = [], []
+            for run in range(RUNS):
+                start = time.perf_counter()
+                streamer.search(f"{name} {run}")
+                seconds.append(time.perf_counter() - start)
+                pages.append(streamer.loaded_pages)
+            streamer.backend.close()
+            print(f"{name:28} {sum(seconds) / RUNS:8.2f} {max(seconds):7.2f} "
+                  f"{sum(pages) / RUNS:6.1f} {server.requests / RUNS:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Wall-clock time and number of requests of a search with every page taking `FakeNyaa.latency` seconds.
+
+Run: python benchmarks/search.py
+"""
+from __future__ import annotations
+import asyncio
+import time
+
+from _fake_nyaa import FakeNyaa, offline_streamer
+
+QUERY_SIZES = (20, 100, 450, None)  # results nyaa has for the query, None for more than ever fetched
+FIXED_PAGES = 6  # how many pages every search used to fetch
+
+streamer = offline_streamer()
+
+
+def sequential_search(text: str) -> None:
+    """How AnimeStreamer.search used to fetch pages, one after another"""
+    pages = [streamer.fetch_page(text, page) for page in range(FIXED_PAGES)]
+    streamer.clear_results(len(pages))
+    for results in pages:
+        streamer.add_page(results)
+
+
+def fixed_search(text: str) -> None:
+    """How AnimeStreamer.search used to fetch pages before adaptive depth, all six at once"""
+    job = streamer.engine.start(text, range(FIXED_PAGES))
+    streamer.clear_results(job.page_count)
+    for _, results in job.as_completed():
+        streamer.add_page(results)
+
+
+def measure(search, text: str) -> tuple[float, int]:
+    """Seconds and requests"""
+    FakeNyaa.requests = 0
+    start = time.perf_counter()
+    search(text)
+    return time.perf_counter() - start, FakeNyaa.requests
+
+
+async def time_to_first_result(text: str) -> tuple[float, float]:
+    """Seconds until the first results are shown and until all pages are loaded"""
+    start = time.perf_counter()
+    first = None
+    async for _ in streamer.search_async(text):
+        if first is None and streamer.results:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{FakeNyaa.latency * 1000:.0f} ms per page, {FakeNyaa.per_page} results per page")
+    for total in QUERY_SIZES:
+        FakeNyaa.total = total
+        print(f"query with {'unlimited' if total is None else total} results:")
+        for name, search in (("sequential, 6 pages", sequential_search), ("concurrent, 6 pages", fixed_search),
+                             ("adaptive", streamer.search)):
+            seconds, requests = measure(search, name)
+            print(f"    {name:20} {seconds:6.3f} s, {requests} requests, {len(streamer.results)} results")
+    FakeNyaa.total = None
+    FakeNyaa.jitter = 0.5
+    first, total = asyncio.run(time_to_first_result("streaming"))
+    print(f"streaming (+-50% latency): first results after {first:.3f} s, all pages after {total:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
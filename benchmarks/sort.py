@@ -0,0 +1,57 @@
+"""Cycling through every sort key and direction of Sort.sorts on a large result set.
+
+Run: python benchmarks/sort.py
+"""
+from __future__ import annotations
+import time
+
+from _fake_nyaa import make_rows
+
+from animestreamer.results import ResultIndex
+
+SORTS = ("seeders", "date", "size", "completed_downloads", "leechers")  # Sort.sorts
+ROWS = 100_000
+
+
+def sort_dicts(results: list[dict], key: str, reverse: bool = False) -> list[dict]:
+    """How AnimeStreamer.sort_results used to sort the raw NyaaPy dicts"""
+    if key == "size":
+        size_dict = {
+            "KiB": 1,
+            "MiB": 1_000,
+            "GiB": 1_000_000
+        }
+        sort_lambda = lambda d: size_dict[d[key].split()[1]] * float(d[key].split()[0])
+    elif key == "date":
+        sort_lambda = lambda d: d[key]
+    else:
+        sort_lambda = lambda d: int(d[key])
+    return sorted(results, key=sort_lambda, reverse=reverse)
+
+
+def cycle(sort) -> float:
+    """Milliseconds per sort, every key in both directions"""
+    start = time.perf_counter()
+    for key in SORTS:
+        for reverse in (True, False):
+            sort(key, reverse)
+    return (time.perf_counter() - start) * 1000 / (len(SORTS) * 2)
+
+
+def main() -> None:
+    rows = make_rows(ROWS)
+    print(f"{ROWS} results, {len(SORTS)} keys x 2 directions")
+    print(f"re-sorting dicts:          {cycle(lambda key, reverse: sort_dicts(rows, key, reverse)):9.3f} ms per sort")
+
+    start = time.perf_counter()
+    index = ResultIndex()
+    index.add(rows)
+    print(f"normalising at ingest:     {(time.perf_counter() - start) * 1000:9.3f} ms once")
+    print(f"cached permutations, cold: {cycle(index.sorted):9.3f} ms per sort")
+    print(f"cached permutations, warm: {cycle(index.sorted):9.3f} ms per sort")
+    page = lambda key, reverse: index.sorted(key, reverse)[:10]
+    print(f"warm, first page sliced:   {cycle(page):9.3f} ms per sort")
+
+
+if __name__ == "__main__":
+    main()
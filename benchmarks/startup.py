@@ -0,0 +1,87 @@
+"""Startup time of the animestreamer entry point, fails when it's over budget.
+
+Import time comes from python -X importtime, time to first render from running main.run in a pseudo-terminal
+until the first frame is drawn (POSIX only). Heavy dependencies must not be imported before the first search.
+
+Run: python benchmarks/startup.py
+"""
+from __future__ import annotations
+import os
+import re
+import select
+import subprocess
+import sys
+import time
+
+IMPORT_BUDGET = 200  # ms, import of animestreamer.main
+FIRST_RENDER_BUDGET = 600  # ms, process start until the first frame
+LAZY = ("NyaaPy", "anitopy", "requests", "bs4")  # loaded on first search / first parse
+FIRST_FRAME = b"Find torrents"
+RUNS = 5
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times() -> dict[str, tuple[int, int]]:
+    """module: (self µs, cumulative µs) for top-level imports of animestreamer.main"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import animestreamer.main"],
+        stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, check=True
+    )
+    times = {}
+    for match in IMPORTTIME.finditer(process.stderr):
+        own, cumulative, _, module = match.groups()
+        times[module] = (int(own), int(cumulative))
+    return times
+
+
+def first_render() -> float:
+    """Milliseconds from starting the app until the first frame is on the terminal"""
+    import pty
+    start = time.perf_counter()
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.environ.update(TERM="xterm-256color", LINES="40", COLUMNS="120")
+        os.execv(sys.executable, [sys.executable, "-c", "from animestreamer.main import run; run()"])
+    output = b""
+    try:
+        while FIRST_FRAME not in output:
+            ready, _, _ = select.select([fd], [], [], 10)
+            if not ready:
+                raise TimeoutError("no frame in 10 s")
+            output += os.read(fd, 65536)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        os.write(fd, b"q")
+        time.sleep(0.3)
+        try:
+            os.kill(pid, 9)
+        except ProcessLookupError:
+            pass
+        os.waitpid(pid, 0)
+        os.close(fd)
+
+
+def main() -> int:
+    runs = [import_times() for _ in range(RUNS)]
+    total = min(times["animestreamer.main"][1] for times in runs) / 1000
+    times = runs[-1]
+    print(f"import animestreamer.main: {total:7.1f} ms (budget {IMPORT_BUDGET} ms)")
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:8]
+    for module, (own, _) in slowest:
+        print(f"    {own / 1000:7.1f} ms  {module}")
+    loaded = [module for module in LAZY if module in times]
+    failed = total > IMPORT_BUDGET
+    if loaded:
+        print(f"imported before the first search: {', '.join(loaded)}")
+        failed = True
+
+    if hasattr(os, "fork"):
+        render = min(first_render() for _ in range(RUNS))
+        print(f"time to first render:      {render:7.1f} ms (budget {FIRST_RENDER_BUDGET} ms)")
+        failed = failed or render > FIRST_RENDER_BUDGET
+    print("over budget" if failed else "within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Repeatable timings of the hot paths, saved as a baseline and compared against it.
+
+search: full-depth search through the rss backend against a local MockNyaaServer with injected latency
+dedup, sort: merging pages into a ResultIndex, cycling through every sort key
+parse: uncached anitopy parses, render: TorrentResults frames while moving through a page
+
+Run: python benchmarks/suite.py [--save] [--compare] [--baseline path] [--tolerance 0.25]
+"""
+from __future__ import annotations
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from _fake_nyaa import make_rows, offline, offline_streamer
+from dedup import with_duplicates
+from sort import SORTS
+
+from animestreamer.backends import MockNyaaServer, RssBackend
+from animestreamer.results import ResultIndex
+
+BASELINE = Path(__file__).with_name("baseline.json")
+REPEAT = 5  # timeit-style, the best of REPEAT runs is compared, the median is shown
+LATENCY = 0.05  # seconds per mock response
+TOTAL = 450  # results the mock has per query, 6 pages
+ROWS = 20_000
+NAMES = 1_000
+
+streamer = offline_streamer()
+
+
+def timings(run: Callable[[], None], setup: Callable[[], None] = lambda: None) -> list[float]:
+    """Milliseconds of REPEAT runs, setup isn't timed"""
+    times = []
+    for _ in range(REPEAT):
+        setup()
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def bench_search() -> list[float]:
+    with MockNyaaServer(latency=LATENCY, total=TOTAL) as server:
+        offline(streamer, RssBackend(server.url))
+        streamer.pages = TOTAL // 75 + 1
+        try:
+            return timings(lambda: streamer.search("suite"))
+        finally:
+            streamer.backend.close()
+
+
+def bench_dedup() -> list[float]:
+    rows = with_duplicates(ROWS)
+    return timings(lambda: ResultIndex().add(rows))
+
+
+def bench_sort() -> list[float]:
+    rows = make_rows(ROWS)
+    index = ResultIndex()
+
+    def setup() -> None:
+        nonlocal index
+        index = ResultIndex()
+        index.add(rows)
+
+    def run() -> None:
+        for key in SORTS:
+            for reverse in (True, False):
+                index.sorted(key, reverse)
+
+    return timings(run, setup)
+
+
+def bench_parse() -> list[float]:
+    import anitopy
+    names = [row["name"] for row in make_rows(NAMES, seed=1)]
+    return timings(lambda: [anitopy.parse(name) for name in names])
+
+
+def bench_render() -> list[float]:
+    from rich.console import Console
+    from animestreamer.widgets import TorrentResults
+    streamer.clear_results()
+    streamer.add_page(make_rows(ROWS // 4))
+    streamer.parser.preparse([]).result()  # wait for background parsing
+    widget = TorrentResults()
+    widget.parsed = True
+    console = Console(file=io.StringIO(), width=160)
+
+    def setup() -> None:
+        streamer.row_cache = type(streamer.row_cache)()
+        streamer.curr_page = 0
+        widget.selected_torrent = 1
+
+    def run() -> None:
+        for _ in range(streamer.show_at_once):
+            console.print(widget.render())
+            widget.next_torrent()
+
+    return timings(run, setup)
+
+
+BENCHMARKS = {
+    "search": bench_search,
+    "dedup": bench_dedup,
+    "sort": bench_sort,
+    "parse": bench_parse,
+    "render": bench_render
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if slower than the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("names", nargs="*", choices=[[], *BENCHMARKS], help="benchmarks to run, all by default")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text()) if args.compare and args.baseline.exists() else {}
+    results = {}
+    regressions = []
+    print(f"{'':8} {'best':>10} {'median':>10} {'baseline':>10}")
+    for name in args.names or BENCHMARKS:
+        times = BENCHMARKS[name]()
+        best = results[name] = min(times)
+        line = f"{name:8} {best:7.2f} ms {statistics.median(times):7.2f} ms"
+        if name in baseline:
+            change = best / baseline[name] - 1
+            line += f" {baseline[name]:7.2f} ms {change:+6.0%}"
+            if change > args.tolerance:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        saved = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        args.baseline.write_text(json.dumps({**saved, **results}, indent=4))
+        print(f"saved to {args.baseline}")
+    if args.compare and not baseline:
+        print(f"no baseline at {args.baseline}, run with --save first")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
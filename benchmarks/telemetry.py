@@ -0,0 +1,53 @@
+"""Parsing of webtorrent's progress output, checked against a captured sample and timed per redraw.
+The sample is three redraws, each clearing the screen and colouring the labels with ANSI codes.
+
+Run: python benchmarks/telemetry.py
+"""
+from __future__ import annotations
+import time
+from pathlib import Path
+
+from animestreamer.telemetry import TelemetryParser
+
+SAMPLE = Path(__file__).with_name("_webtorrent_stdout.txt")
+CLEAR_SCREEN = "\x1b[2J"  # webtorrent starts every redraw with it
+REDRAW_TIMES = (1.0, 1.5, 3.0)  # seconds after Enter, the parser is created at 0
+CHUNK = 7  # splits lines and escape codes, the pipe doesn't keep them whole
+REPEAT = 2000
+
+
+def redraws() -> list[str]:
+    output = SAMPLE.read_text(encoding="utf-8")
+    head, *frames = output.split(CLEAR_SCREEN)
+    return [head + CLEAR_SCREEN + frames[0]] + [CLEAR_SCREEN + frame for frame in frames[1:]]
+
+
+def check(frames: list[str]) -> None:
+    parser = TelemetryParser(requested=0)
+    for now, frame in zip(REDRAW_TIMES, frames):
+        for start in range(0, len(frame), CHUNK):
+            parser.feed(frame[start:start + CHUNK], now)
+    telemetry = parser.telemetry
+    assert (telemetry.peers, telemetry.total_peers) == (7, 23), telemetry
+    assert telemetry.uploaded == 3_100_000, telemetry
+    assert telemetry.upload_speed == 950_000, telemetry  # 1.9 MB uploaded in the 2 s after the first redraw
+    assert telemetry.download_speed == 2_400_000, telemetry
+    assert (telemetry.downloaded, telemetry.length) == (48_200_000, 1_400_000_000), telemetry
+    assert telemetry.startup_latency == telemetry.time_to_first_byte == 1.0, telemetry
+
+
+def main() -> None:
+    frames = redraws()
+    check(frames)
+    print(f"{len(frames)} redraws of {SAMPLE.name} parsed as expected")
+    parser = TelemetryParser()
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        for frame in frames:
+            parser.feed(frame)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed / (REPEAT * len(frames)) * 1e6:.1f} µs per redraw")
+
+
+if __name__ == "__main__":
+    main()